@@ -0,0 +1,44 @@
+"""add task and user access indexes
+
+Revision ID: 216af26939dd
+Revises: 3d5da48206cf
+Create Date: 2026-10-17 09:12:41.503218
+
+"""
+from typing import Sequence, Union
+import sqlmodel
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '216af26939dd'
+down_revision: Union[str, Sequence[str], None] = '3d5da48206cf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so live traffic is not blocked on large tables.
+    # The unique email index fails if duplicate emails already exist.
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True, postgresql_concurrently=True)
+        op.create_index('ix_users_created_at', 'users', ['created_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_tasks_created_at_uid', 'tasks', ['created_at', 'uid'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_tasks_created_by_created_at_uid', 'tasks', ['created_by', 'created_at', 'uid'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_tasks_assigned_to_created_at_uid', 'tasks', ['assigned_to', 'created_at', 'uid'], unique=False, postgresql_where=sa.text('assigned_to IS NOT NULL'), postgresql_concurrently=True)
+        op.create_index('ix_tasks_status_created_at_uid', 'tasks', ['status', 'created_at', 'uid'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_tasks_priority_created_at_uid', 'tasks', ['priority', 'created_at', 'uid'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_priority_created_at_uid', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_status_created_at_uid', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_assigned_to_created_at_uid', table_name='tasks', postgresql_where=sa.text('assigned_to IS NOT NULL'), postgresql_concurrently=True)
+        op.drop_index('ix_tasks_created_by_created_at_uid', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_created_at_uid', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_users_created_at', table_name='users', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_users_email'), table_name='users', postgresql_concurrently=True)
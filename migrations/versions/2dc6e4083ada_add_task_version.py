@@ -0,0 +1,29 @@
+"""add task version
+
+Revision ID: 2dc6e4083ada
+Revises: 70d8ae9ae00d
+Create Date: 2026-10-17 12:40:07.331529
+
+"""
+from typing import Sequence, Union
+import sqlmodel
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2dc6e4083ada'
+down_revision: Union[str, Sequence[str], None] = '70d8ae9ae00d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant server default is a metadata-only change on Postgres 11+
+    op.add_column('tasks', sa.Column('version', sa.Integer(), server_default=sa.text('1'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tasks', 'version')
@@ -0,0 +1,46 @@
+"""add task counters
+
+Revision ID: 70d8ae9ae00d
+Revises: 3bf4394a2925
+Create Date: 2026-10-17 11:26:53.874120
+
+"""
+from typing import Sequence, Union
+import sqlmodel
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '70d8ae9ae00d'
+down_revision: Union[str, Sequence[str], None] = '3bf4394a2925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_counters',
+    sa.Column('dimension', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('bucket', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('dimension', 'bucket')
+    )
+    # Seed the counters from the existing rows
+    op.execute("""
+        INSERT INTO task_counters (dimension, bucket, count)
+        SELECT 'status', status, count(*) FROM tasks GROUP BY status
+        UNION ALL
+        SELECT 'priority', priority, count(*) FROM tasks GROUP BY priority
+        UNION ALL
+        SELECT 'assignee', coalesce(assigned_to::text, 'unassigned'), count(*) FROM tasks GROUP BY assigned_to
+    """)
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_open_due_date', 'tasks', ['due_date'], unique=False, postgresql_where=sa.text("status <> 'completed'"), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_open_due_date', table_name='tasks', postgresql_where=sa.text("status <> 'completed'"), postgresql_concurrently=True)
+    op.drop_table('task_counters')
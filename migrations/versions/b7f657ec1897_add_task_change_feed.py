@@ -0,0 +1,48 @@
+"""add task change feed
+
+Revision ID: b7f657ec1897
+Revises: 581eeea1c96a
+Create Date: 2026-10-17 14:48:52.906113
+
+"""
+from typing import Sequence, Union
+import sqlmodel
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7f657ec1897'
+down_revision: Union[str, Sequence[str], None] = '581eeea1c96a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.schema.CreateSequence(sa.Sequence('task_change_seq')))
+    op.create_table('task_tombstones',
+    sa.Column('uid', sa.UUID(), nullable=False),
+    sa.Column('change_seq', sa.BigInteger(), server_default=sa.text("nextval('task_change_seq')"), nullable=False),
+    sa.Column('created_by', sa.Uuid(), nullable=False),
+    sa.Column('assigned_to', sa.Uuid(), nullable=True),
+    sa.Column('deleted_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('uid')
+    )
+    op.create_index('ix_task_tombstones_change_seq', 'task_tombstones', ['change_seq'], unique=False)
+    # A volatile default rewrites tasks once, numbering the existing rows
+    op.add_column('tasks', sa.Column('change_seq', sa.BigInteger(), server_default=sa.text("nextval('task_change_seq')"), nullable=False))
+    op.add_column('tasks_archive', sa.Column('change_seq', sa.BigInteger(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_change_seq', 'tasks', ['change_seq'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_change_seq', table_name='tasks', postgresql_concurrently=True)
+    op.drop_column('tasks_archive', 'change_seq')
+    op.drop_column('tasks', 'change_seq')
+    op.drop_index('ix_task_tombstones_change_seq', table_name='task_tombstones')
+    op.drop_table('task_tombstones')
+    op.execute(sa.schema.DropSequence(sa.Sequence('task_change_seq')))
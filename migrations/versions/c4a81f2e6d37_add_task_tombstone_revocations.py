@@ -0,0 +1,36 @@
+"""add task tombstone revocations
+
+Revision ID: c4a81f2e6d37
+Revises: b7f657ec1897
+Create Date: 2026-10-18 10:12:40.318254
+
+"""
+from typing import Sequence, Union
+import sqlmodel
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a81f2e6d37'
+down_revision: Union[str, Sequence[str], None] = 'b7f657ec1897'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('task_tombstones', sa.Column('revoked', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+    # A task can now leave several tombstones; the primary key index replaces ix_task_tombstones_change_seq
+    op.drop_constraint('task_tombstones_pkey', 'task_tombstones', type_='primary')
+    op.create_primary_key('task_tombstones_pkey', 'task_tombstones', ['change_seq'])
+    op.drop_index('ix_task_tombstones_change_seq', table_name='task_tombstones')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM task_tombstones WHERE revoked")
+    op.create_index('ix_task_tombstones_change_seq', 'task_tombstones', ['change_seq'], unique=False)
+    op.drop_constraint('task_tombstones_pkey', 'task_tombstones', type_='primary')
+    op.create_primary_key('task_tombstones_pkey', 'task_tombstones', ['uid'])
+    op.drop_column('task_tombstones', 'revoked')
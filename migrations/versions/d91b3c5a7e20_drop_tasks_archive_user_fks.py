@@ -0,0 +1,31 @@
+"""drop tasks_archive user fks
+
+Revision ID: d91b3c5a7e20
+Revises: c4a81f2e6d37
+Create Date: 2026-10-18 10:41:07.552913
+
+"""
+from typing import Sequence, Union
+import sqlmodel
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91b3c5a7e20'
+down_revision: Union[str, Sequence[str], None] = 'c4a81f2e6d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Archived tasks outlive their users, like task_tombstones
+    op.drop_constraint('tasks_archive_assigned_to_fkey', 'tasks_archive', type_='foreignkey')
+    op.drop_constraint('tasks_archive_created_by_fkey', 'tasks_archive', type_='foreignkey')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_foreign_key('tasks_archive_created_by_fkey', 'tasks_archive', 'users', ['created_by'], ['uid'])
+    op.create_foreign_key('tasks_archive_assigned_to_fkey', 'tasks_archive', 'users', ['assigned_to'], ['uid'])
@@ -0,0 +1,40 @@
+"""add task reminders
+
+Revision ID: f9c2902e3459
+Revises: 2dc6e4083ada
+Create Date: 2026-10-17 13:22:41.508217
+
+"""
+from typing import Sequence, Union
+import sqlmodel
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f9c2902e3459'
+down_revision: Union[str, Sequence[str], None] = '2dc6e4083ada'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('reminder_sent_at', sa.DateTime(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_reminder_due_date_uid', 'tasks', ['due_date', 'uid'], unique=False,
+            postgresql_where=sa.text("status <> 'completed' AND reminder_sent_at IS NULL"),
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tasks_reminder_due_date_uid', table_name='tasks',
+            postgresql_where=sa.text("status <> 'completed' AND reminder_sent_at IS NULL"),
+            postgresql_concurrently=True
+        )
+    op.drop_column('tasks', 'reminder_sent_at')
@@ -1,16 +1,41 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from src.auth.routes import auth_router
 from src.users.routes import user_router
 from src.tasks.routes import task_router
+from src.metrics.routes import metrics_router
+from src.tasks.reminders import reminder_scheduler
+from src.tasks.archive import task_archiver
+from src.tasks.notifications import assignment_digest
+from src.core.config import config_obj
+from src.db.redis import revoked_tokens
+from src.db.replicas import replica_router
 from .errors import register_error_handlers
 from .middleware import register_middleware
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    revoked_tokens.start()
+    replica_router.start()
+    if config_obj.TASK_REMINDERS_ENABLED:
+        reminder_scheduler.start()
+    if config_obj.TASK_ARCHIVE_ENABLED:
+        task_archiver.start()
+    assignment_digest.start()
+    yield
+    await reminder_scheduler.stop()
+    await task_archiver.stop()
+    await assignment_digest.stop()
+    await replica_router.stop()
+
+
 version = "v1"
 app = FastAPI(
     title="Task Collab API",
     description="The descroiption",
     version=version,
-
+    lifespan=lifespan,
 )
 register_error_handlers(app) 
 register_middleware(app)  
@@ -18,4 +43,5 @@ register_middleware(app)
 app.include_router(auth_router, prefix=f"/api/{version}/auth", tags=['auth'])
 app.include_router(user_router,prefix=f"/api/{version}/users", tags=["users"])
 app.include_router(task_router,prefix=f"/api/{version}/tasks", tags=["tasks"])
+app.include_router(metrics_router,prefix=f"/api/{version}/metrics", tags=["metrics"])
 
@@ -2,12 +2,14 @@ from fastapi import Request, status, Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from .utils import decode_token
 from fastapi.exceptions import HTTPException
+from redis.exceptions import RedisError
 from src.db.redis import token_in_blocklist
-from src.db.main import get_session
+from src.db.replicas import get_read_session
 from sqlmodel.ext.asyncio.session import AsyncSession
 from .service import UserService
+from .principals import principal_cache, get_authz_version
+from .schemas import PrincipalModel
 from typing import List, Any
-from src.db.models import User
 
 user_service = UserService()
 
@@ -19,7 +21,7 @@ class TokenBearer(HTTPBearer):
         creds = await super().__call__(request)
         token = creds.credentials
         token_data = decode_token(token)
-        if not self.token_valid(token):
+        if token_data is None:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={
                 "error": "This TOken isinvalid or expired",
                 "resolution":"Please get new token."
@@ -37,11 +39,6 @@ class TokenBearer(HTTPBearer):
         self.verify_token_data(token_data)
         return token_data
 
-    def token_valid(self,token:str)->bool:
-        token_data = decode_token(token)
-        return True if token_data is not None else False
-
-    
     def verify_token_data(self, token_data:dict):
         raise NotImplementedError("Please Overridde this method in child class")
     
@@ -56,24 +53,77 @@ class RefreshTokenBearer(TokenBearer):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Please Provide an Refresh Token")
         
 
-async def get_current_user(token_details : dict = Depends(AccessTokenBearer()), session:AsyncSession = Depends(get_session)):
-    user_email = token_details['user']['email']
-    user = await user_service.get_user_by_email(user_email, session)
+# One shared instance, so FastAPI resolves (and decodes) the token once per
+# request no matter how many dependencies ask for it
+access_token_bearer = AccessTokenBearer()
+
+
+async def get_principal(token_data: dict, session: AsyncSession) -> PrincipalModel | None:
+    user_data = token_data['user']
+    if 'user_uid' in user_data:
+        return await principal_cache.get(user_data['user_uid'], session)
+    # Tokens issued without a uid still resolve, just without the cache
+    user = await user_service.get_user_by_email(user_data['email'], session)
+    return PrincipalModel.model_validate(user, from_attributes=True) if user else None
+
+
+async def get_current_user(token_details : dict = Depends(access_token_bearer), session:AsyncSession = Depends(get_read_session)):
+    """The caller as a cached PrincipalModel (uid, username, email, role, is_verified)."""
+    user = await get_principal(token_details, session)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={
+            "error": "This TOken belongs to a user that no longer exists",
+            "resolution":"Please get new token."
+        })
     return user
 
 
 
+async def get_user_from_token(token: str, session: AsyncSession) -> PrincipalModel | None:
+    """Authenticates a raw access token for transports without an Authorization header (WebSockets)."""
+    token_data = decode_token(token)
+    if token_data is None or token_data['refresh']:
+        return None
+    if await token_in_blocklist(token_data['jti']):
+        return None
+    return await get_principal(token_data, session)
+
+
 class RoleChecker:
     def __init__(self, allowed_roles: List[str]) -> None:
         self.allowed_roles = allowed_roles
 
-    async def __call__(self, current_user=Depends(get_current_user)) -> Any:
-        if not current_user.is_verified:
+    @staticmethod
+    async def claims_hold(user_data: dict) -> bool:
+        if 'authz_version' not in user_data:
+            return False
+        try:
+            version = await get_authz_version(user_data['user_uid'])
+        except RedisError:
+            return False
+        return version is not None and version == user_data['authz_version']
+
+    async def __call__(
+        self,
+        token_details: dict = Depends(access_token_bearer),
+        session: AsyncSession = Depends(get_read_session)
+    ) -> Any:
+        """Authorizes from the token's claims; the authz stamp in Redis says if they still hold."""
+        user_data = token_details['user']
+        if await self.claims_hold(user_data):
+            role, is_verified = user_data['role'], user_data['is_verified']
+        else:
+            # Claims from before the account changed, from before they existed,
+            # or that Redis can no longer vouch for: ask the current principal
+            current_user = await get_current_user(token_details, session)
+            role, is_verified = current_user.role, current_user.is_verified
+
+        if not is_verified:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Please verify your account to perform this action"
             )
-        if current_user.role not in self.allowed_roles:
+        if role not in self.allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You are not permitted to perform this action"
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import uuid
+from typing import Optional
+
+from pydantic import ValidationError
+from redis.exceptions import RedisError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.cache import LRUCache
+from src.db.main import async_session_maker
+from src.db.models import User
+from src.db.redis import redis_client
+from src.db.replicas import is_replica_session
+from src.metrics import register_metrics
+from .schemas import PrincipalModel
+
+PRINCIPAL_CACHE_TTL = 300       # seconds a principal lives in Redis
+LOCAL_PRINCIPAL_TTL = 30        # bounds staleness if an invalidation broadcast is missed
+LOCAL_PRINCIPAL_SIZE = 4096
+PRINCIPAL_INVALIDATIONS_CHANNEL = "principals:invalidate"
+LISTENER_RETRY_SECONDS = 1
+
+# Caches the principal only while the user's authz stamp is the one read
+# before loading it, i.e. no invalidate() ran in between
+FILL_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+logger = logging.getLogger(__name__)
+
+
+# --------------------------------------------------
+# Authorization versions (checked against the authz_version token claim)
+# --------------------------------------------------
+# Random stamps rather than counters: a stamp lost from Redis is never
+# recreated with a value an old token carries, so its claims stop holding.
+def authz_version_key(user_uid) -> str:
+    return f"authz_version:{user_uid}"
+
+
+async def get_authz_version(user_uid) -> Optional[str]:
+    """The user's current stamp, or None when Redis has none."""
+    return await redis_client.get(authz_version_key(user_uid))
+
+
+async def issue_authz_version(user_uid) -> str:
+    """The stamp to put in a new token, starting one if the user has none."""
+    key = authz_version_key(user_uid)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.set(key, uuid.uuid4().hex, nx=True)
+        pipe.get(key)
+        _, version = await pipe.execute()
+    return version
+
+
+class PrincipalCache:
+    """Read-through cache of PrincipalModel by user uid: local TTL LRU, then Redis, then the DB.
+
+    Writers call invalidate() after committing a change to a user. It drops
+    the Redis entry and broadcasts the uid, and every worker's listener drops
+    its local copy. It also replaces the user's authz stamp, which retires the
+    role and verification claims in every access token issued before.
+    """
+
+    def __init__(self):
+        self.local = LRUCache(LOCAL_PRINCIPAL_SIZE, LOCAL_PRINCIPAL_TTL)
+        self.fill_script = redis_client.register_script(FILL_SCRIPT)
+        self.listener: Optional[asyncio.Task] = None
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.stale_fills = 0
+        self.invalidations = 0
+        self.redis_errors = 0
+
+    @staticmethod
+    def key(user_uid) -> str:
+        return f"principal:{user_uid}"
+
+    async def get(self, user_uid, session: AsyncSession) -> Optional[PrincipalModel]:
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.create_task(self.listen())
+
+        key = self.key(user_uid)
+        principal = self.local.get(key)
+        if principal is not None:
+            self.local_hits += 1
+            return principal
+
+        try:
+            cached = await redis_client.get(key)
+            if cached is not None:
+                principal = PrincipalModel.model_validate_json(cached)
+                self.local.set(key, principal)
+                self.redis_hits += 1
+                return principal
+        except (RedisError, ValidationError):
+            self.redis_errors += 1
+
+        self.misses += 1
+        try:
+            # Read before the row, so a change committed after this load is seen by fill()
+            version = await issue_authz_version(user_uid)
+        except RedisError:
+            self.redis_errors += 1
+            version = None
+
+        if is_replica_session(session):
+            # A lagging replica could hand back the row from before an
+            # invalidation, and it would then be cached for everyone
+            async with async_session_maker() as primary:
+                row = await self.load(user_uid, primary)
+        else:
+            row = await self.load(user_uid, session)
+        if row is None:
+            return None
+
+        principal = PrincipalModel.model_validate(row._mapping)
+        # Without Redis only the local copy is kept, bounded by LOCAL_PRINCIPAL_TTL
+        if version is None or await self.fill(user_uid, version, principal):
+            self.local.set(key, principal)
+        return principal
+
+    async def fill(self, user_uid, version: str, principal: PrincipalModel) -> bool:
+        """Caches the principal in Redis unless the user changed since `version` was read."""
+        try:
+            filled = await self.fill_script(
+                keys=[authz_version_key(user_uid), self.key(user_uid)],
+                args=[version, principal.model_dump_json(), PRINCIPAL_CACHE_TTL]
+            )
+        except RedisError:
+            self.redis_errors += 1
+            return True
+        if not filled:
+            self.stale_fills += 1
+        return bool(filled)
+
+    @staticmethod
+    async def load(user_uid, session: AsyncSession):
+        result = await session.exec(
+            select(User.uid, User.username, User.email, User.role, User.is_verified)
+            .where(User.uid == user_uid)
+        )
+        return result.first()
+
+    async def invalidate(self, *user_uids) -> None:
+        if not user_uids:
+            return
+        keys = [self.key(uid) for uid in user_uids]
+        for key in keys:
+            self.local.delete(key)
+        self.invalidations += len(keys)
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys)
+                for uid in user_uids:
+                    pipe.set(authz_version_key(uid), uuid.uuid4().hex)
+                    pipe.publish(PRINCIPAL_INVALIDATIONS_CHANNEL, str(uid))
+                await pipe.execute()
+        except RedisError:
+            # Other workers fall back on LOCAL_PRINCIPAL_TTL; existing tokens
+            # keep their claims until they expire.
+            logger.warning("Could not invalidate principals %s", user_uids)
+            self.redis_errors += 1
+
+    async def listen(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(PRINCIPAL_INVALIDATIONS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.local.delete(self.key(message["data"]))
+            except RedisError:
+                logger.warning("Principal invalidation subscription lost, retrying")
+                await asyncio.sleep(LISTENER_RETRY_SECONDS)
+            finally:
+                await pubsub.aclose()
+
+    def metrics(self) -> dict:
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "stale_fills": self.stale_fills,
+            "local_size": len(self.local.entries),
+            "invalidations": self.invalidations,
+            "redis_errors": self.redis_errors,
+        }
+
+
+principal_cache = PrincipalCache()
+register_metrics("principal_cache", principal_cache.metrics)
@@ -7,9 +7,10 @@ from fastapi.exceptions import HTTPException
 from .utils import create_access_token, decode_token, verify_password, create_url_safe_token, decode_url_safe_token, generate_password_hash
 from datetime import timedelta, datetime
 from fastapi.responses import JSONResponse
-from .dependencies import RefreshTokenBearer, AccessTokenBearer, get_current_user, RoleChecker
+from .dependencies import RefreshTokenBearer, access_token_bearer, get_current_user, RoleChecker
+from .principals import issue_authz_version
 from src.db.redis import add_jti_to_blocklist
-from src.mail import create_message, mail
+from src.mail import enqueue_email
 from src.core.config import config_obj
 from src.db.main import get_session
 
@@ -19,16 +20,26 @@ role_checker = RoleChecker(["admin", "user"])
 
 REFRESH_TOKEN_EXPIRY = True
 
+
+async def access_token_claims(user) -> dict:
+    """Everything RoleChecker needs, so authorization never loads the user."""
+    return {
+        'email':user.email,
+        'user_uid': str(user.uid),
+        'role':user.role,
+        'is_verified': user.is_verified,
+        'authz_version': await issue_authz_version(user.uid),
+    }
+
 @auth_router.post('/send_mail')
 async def send_mail(emails:EmailModel):
     emails = emails.addresses
     html = "<h1>Welcome to Task Collaboration APP</h1>"
-    message = create_message(
+    await enqueue_email(
         recipients=emails,
         subject="Welcome",
         body=html
     )
-    await mail.send_message(message)
     return {
         "message":"Email Sent Successfully!"
     }
@@ -50,12 +61,11 @@ async def create_user(user_data:CreateUserModel,session: AsyncSession = Depends(
     <h1>Verify Your Email</h1>
     <p>Please Click this <a href="{link}">link</a> to Verify Your Email</p>
     """
-    message = create_message(
+    await enqueue_email(
         recipients=[email],
         subject="Verify Your Email",
         body=html_msg
     )
-    await mail.send_message(message)
     return {
         "message":"Account Created! Check Email to Verify Your Account!",
         "user":new_user
@@ -66,7 +76,7 @@ async def verify_user_account(token:str, session:AsyncSession = Depends(get_sess
     token_data = decode_url_safe_token(token)
     user_email = token_data.get('email')
     if user_email:
-        user = await user_service.get_user_by_email(user_email, session)
+        user = await user_service.get_user_by_email(user_email, session, writable=True)
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="user not found")
 
@@ -90,14 +100,15 @@ async def login_users(login_data:UserLoginModel, session: AsyncSession = Depends
     password = login_data.password
     user = await user_service.get_user_by_email(email,session)
     if user is not None:
-        password_valid = verify_password(password,user.password_hash)
+        # End the read transaction so the pooled connection is not held while bcrypt runs
+        await session.commit()
+        password_valid, new_hash = await verify_password(password,user.password_hash)
         if password_valid:
+            if new_hash is not None:
+                # Stored with an older BCRYPT_ROUNDS; upgrade while we have the password
+                await user_service.rehash_password(user, new_hash, session)
             access_token = create_access_token(
-                user_data ={
-                    'email':user.email,
-                    'user_uid': str(user.uid),
-                    'role':user.role
-                }
+                user_data = await access_token_claims(user)
             )
             refresh_token = create_access_token(
                 user_data ={
@@ -125,16 +136,21 @@ async def login_users(login_data:UserLoginModel, session: AsyncSession = Depends
 
 
 @auth_router.get('/me')
-async def get_current_user(user = Depends(get_current_user), _bool=Depends(role_checker)):
-    return user
+async def get_current_user(user = Depends(get_current_user), _bool=Depends(role_checker), session: AsyncSession = Depends(get_session)):
+    # The full record; the principal only carries what authorization needs
+    return await user_service.get_user_by_email(user.email, session)
 
 
 @auth_router.get('/refresh_token')
-async def get_new_access_token(token_details: dict = Depends(RefreshTokenBearer())):
+async def get_new_access_token(token_details: dict = Depends(RefreshTokenBearer()), session: AsyncSession = Depends(get_session)):
     expiry_timestamp = token_details['exp']
     if datetime.fromtimestamp(expiry_timestamp) > datetime.now():
+        # Reload the user so the new token carries their current role and verification
+        user = await user_service.get_user_by_email(token_details['user']['email'], session)
+        if user is None:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or Expired Token")
         new_access_token = create_access_token(
-            user_data=token_details['user']
+            user_data=await access_token_claims(user)
         )
         return JSONResponse(
             content = {
@@ -147,7 +163,7 @@ async def get_new_access_token(token_details: dict = Depends(RefreshTokenBearer(
 
 
 @auth_router.get('/logout')
-async def revoke_token(token_details: dict = Depends(AccessTokenBearer())):
+async def revoke_token(token_details: dict = Depends(access_token_bearer)):
     jti = token_details['jti']
     await add_jti_to_blocklist(jti)
     return JSONResponse(
@@ -170,12 +186,11 @@ async def password_reset_request(email_data:PasswordResetModel):
     <h1>Reset Your Password</h1>
     <p>Please Click this <a href="{link}">link</a> to Reset Your Password/p>
     """
-    message = create_message(
+    await enqueue_email(
         recipients=[email],
         subject="Reset your Password",
         body=html_msg
     )
-    await mail.send_message(message)
     return JSONResponse(
         content={ "message":"Please Check Your Email for instruction to reset your password"}, status_code=status.HTTP_200_OK
     )
@@ -194,11 +209,11 @@ async def reset_account_password(token:str,passwords:PasswordResetConfirmModel,
     token_data = decode_url_safe_token(token)
     user_email = token_data.get('email')
     if user_email:  
-        user = await user_service.get_user_by_email(user_email, session)
+        user = await user_service.get_user_by_email(user_email, session, writable=True)
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="user not found")
 
-        password_hash = generate_password_hash(new_password)
+        password_hash = await generate_password_hash(new_password)
         await user_service.update_user(user, {'password_hash':password_hash}, session)
 
         return JSONResponse(
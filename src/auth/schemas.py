@@ -19,6 +19,14 @@ class UserResponseModel(BaseModel):
     created_at : datetime
     updated_at : datetime
 
+class PrincipalModel(BaseModel):
+    """The slice of User that authentication and authorization read on every request."""
+    uid: uuid.UUID
+    username: str
+    email: str
+    role: str
+    is_verified: bool
+
 class UserLoginModel(BaseModel):
     email : str
     password : str
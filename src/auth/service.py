@@ -1,13 +1,18 @@
+from sqlalchemy import update
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from src.core.config import config_obj
+from src.db import fastpath
 from src.db.models import User
 from .schemas import CreateUserModel
 from .utils import generate_password_hash
+from .principals import principal_cache
 from src.errors import UserNotFound, UserAlreadyExists
 
 
 class UserService:
+    fast_path = config_obj.USER_LOOKUP_FAST_PATH
 
     # --------------------------------------------------
     # GET USER BY EMAIL (Single source of truth)
@@ -15,8 +20,12 @@ class UserService:
     async def get_user_by_email(
         self,
         user_email: str,
-        session: AsyncSession
+        session: AsyncSession,
+        writable: bool = False
     ):
+        """A read-only UserRecord on the fast path; writable=True for an ORM User to change."""
+        if self.fast_path and not writable:
+            return await fastpath.user_by_email(session, user_email)
         statement = select(User).where(User.email == user_email)
         result = await session.exec(statement)
         user = result.first()
@@ -48,7 +57,7 @@ class UserService:
 
         new_user = User(
             **user_dict,
-            password_hash=generate_password_hash(password)
+            password_hash=await generate_password_hash(password)
         )
 
         session.add(new_user)
@@ -57,6 +66,22 @@ class UserService:
 
         return new_user
 
+    # --------------------------------------------------
+    # REHASH PASSWORD (same password, current bcrypt settings)
+    # --------------------------------------------------
+    async def rehash_password(
+        self,
+        user,
+        password_hash: str,
+        session: AsyncSession
+    ):
+        # Not an account change, so cached principals and issued tokens stay valid.
+        # Updated by uid, so login can hand in a read-only record.
+        await session.execute(
+            update(User).where(User.uid == user.uid).values(password_hash=password_hash)
+        )
+        await session.commit()
+
     # --------------------------------------------------
     # UPDATE USER
     # --------------------------------------------------
@@ -73,5 +98,6 @@ class UserService:
             setattr(user, key, value)
 
         await session.commit()
+        await principal_cache.invalidate(user.uid)
         await session.refresh(user)
         return user
@@ -1,25 +1,88 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import jwt
 from datetime import timedelta, datetime
 from src.core.config import config_obj
+import hashlib
 import logging
+import os
+import time
 import uuid
 from  itsdangerous import URLSafeTimedSerializer
+from src.core.cache import LRUCache
+from src.metrics import register_metrics
 
 
 
 ACCESS_TOKEN_EXPIRY = 3600
+VERIFIED_TOKEN_CACHE_SIZE = 4096
 
 password_context = CryptContext(
-    schemes=['bcrypt']
+    schemes=['bcrypt'],
+    bcrypt__rounds=config_obj.BCRYPT_ROUNDS
 )
 
-def generate_password_hash(password:str)->str:
-    hash = password_context.hash(password)
-    return hash
 
-def verify_password(plain_password: str, hashed_password : str) -> bool:
-    return password_context.verify(plain_password,hashed_password)
+class PasswordHasher:
+    """Runs bcrypt on a small thread pool so hashing never blocks the event loop.
+
+    bcrypt releases the GIL, so the pool hashes in parallel. The semaphore
+    caps jobs in flight, and callers beyond it wait on the loop (queue_depth)
+    instead of piling up inside the executor.
+    """
+
+    def __init__(self, workers: int = config_obj.PASSWORD_HASH_WORKERS or os.cpu_count() or 1):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.slots = asyncio.Semaphore(workers)
+        self.queue_depth = 0
+        self.running = 0
+        self.completed = 0
+        self.rehashed = 0
+
+    async def run(self, fn, *args):
+        self.queue_depth += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.queue_depth -= 1
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self.slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self.run(password_context.hash, password)
+
+    async def verify_and_update(self, password: str, password_hash: str) -> tuple[bool, str | None]:
+        """(valid, new_hash); new_hash is set when the stored hash uses outdated settings (e.g. rounds)."""
+        valid, new_hash = await self.run(password_context.verify_and_update, password, password_hash)
+        if new_hash is not None:
+            self.rehashed += 1
+        return valid, new_hash
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "running": self.running,
+            "completed": self.completed,
+            "rehashed": self.rehashed,
+        }
+
+
+password_hasher = PasswordHasher()
+register_metrics("password_hasher", password_hasher.metrics)
+
+
+async def generate_password_hash(password:str)->str:
+    return await password_hasher.hash(password)
+
+async def verify_password(plain_password: str, hashed_password : str) -> tuple[bool, str | None]:
+    """(valid, new_hash or None), see PasswordHasher.verify_and_update."""
+    return await password_hasher.verify_and_update(plain_password, hashed_password)
 
 def create_access_token(user_data:dict, expiry:timedelta = None, refresh : bool= False):
     payload = {}
@@ -34,16 +97,65 @@ def create_access_token(user_data:dict, expiry:timedelta = None, refresh : bool=
     )
     return token
 
-def decode_token(token:str)->str:
-    try:
-        token_data = jwt.decode(
-            jwt=token,
-            key=config_obj.JWT_SECRET,
-            algorithms=config_obj.JWT_ALGORITHM
-        )
+class VerifiedTokenCache:
+    """Claims of tokens whose signature already checked out, until their exp.
+
+    Keyed by a digest so raw tokens are not kept in memory. Revocation is
+    still checked against the blocklist on every request.
+    """
+
+    def __init__(self, maxsize: int = VERIFIED_TOKEN_CACHE_SIZE):
+        self.entries = LRUCache(maxsize, ttl=ACCESS_TOKEN_EXPIRY)
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def decode(self, token: str) -> dict | None:
+        key = self.key(token)
+        token_data = self.entries.get(key)
+        if token_data is not None:
+            self.hits += 1
+            return token_data
+
+        self.misses += 1
+        try:
+            token_data = jwt.decode(
+                jwt=token,
+                key=config_obj.JWT_SECRET,
+                algorithms=config_obj.JWT_ALGORITHM
+            )
+        except jwt.PyJWTError as e:
+            # Bad and expired tokens are routine client errors, not worth a traceback
+            self.rejected += 1
+            logging.info("Rejected token: %s", e)
+            return None
+
+        ttl = token_data.get('exp', 0) - time.time()
+        if ttl > 0:
+            self.entries.set(key, token_data, ttl=ttl)
         return token_data
-    except jwt.PyJWTError as e:
-        logging.exception(e)
+
+    def metrics(self) -> dict:
+        return {
+            "size": len(self.entries.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+            "evictions": self.entries.evictions,
+        }
+
+
+verified_tokens = VerifiedTokenCache()
+register_metrics("verified_tokens", verified_tokens.metrics)
+
+
+def decode_token(token:str)->dict | None:
+    """Verified claims of a JWT, or None; callers must not mutate the returned dict."""
+    return verified_tokens.decode(token)
 
 #======================================================
 serializer = URLSafeTimedSerializer(
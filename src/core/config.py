@@ -2,6 +2,21 @@ from pydantic_settings import BaseSettings,SettingsConfigDict
 
 class Settings(BaseSettings):
     DATABASE_URL : str
+    DATABASE_ECHO: bool = False
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_TIMEOUT: float = 30       # seconds to wait for a connection before failing the request
+    DATABASE_POOL_RECYCLE: int = 1800       # seconds; reconnect before server or proxy idle limits cut in
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100    # prepared statements kept per connection
+    DATABASE_PGBOUNCER: bool = False    # behind pgbouncer transaction pooling: unique statement names
+    DATABASE_REPLICA_URLS: str = ""     # comma-separated; reads stay on the primary when empty
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 5
+    DATABASE_REPLICA_CHECK_INTERVAL_SECONDS: float = 5
+    DATABASE_READ_YOUR_WRITES_SECONDS: int = 10     # reads stick to the primary this long after a user writes
+    USER_LOOKUP_FAST_PATH: bool = True      # single-row lookups as raw asyncpg statements (src/db/fastpath.py)
+    EMPLOYEE_LOOKUP_FAST_PATH: bool = True
+    TASK_LOOKUP_FAST_PATH: bool = True
     JWT_SECRET : str
     JWT_ALGORITHM:str
     REDIS_HOST: str = "localhost"
@@ -17,6 +32,16 @@ class Settings(BaseSettings):
     USE_CREDENTIALS:bool=True
     VALIDATE_CERTS:bool=True
     DOMAIN : str
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 0     # 0 = one per CPU
+    TASK_REMINDERS_ENABLED: bool = True
+    TASK_REMINDER_INTERVAL_SECONDS: int = 60
+    TASK_REMINDER_LOOKAHEAD_HOURS: int = 24
+    TASK_ARCHIVE_ENABLED: bool = True
+    TASK_ARCHIVE_INTERVAL_SECONDS: int = 300
+    TASK_ARCHIVE_AFTER_DAYS: int = 30
+    TASK_ASSIGNMENT_DIGEST_WINDOW_SECONDS: int = 60     # assignments to one person within this go out as one email
+    TASK_ASSIGNMENT_DIGEST_INTERVAL_SECONDS: int = 5
     model_config = SettingsConfigDict(
         env_file = ".env",
         extra="ignore"
@@ -0,0 +1,86 @@
+"""Single-row lookups as fixed SQL on the session's connection.
+
+They skip statement compilation and the ORM identity map, and return plain
+__slots__ records instead of model instances. They run through
+exec_driver_sql, i.e. the same asyncpg adapter as ORM queries: in the
+session's transaction (begun if this is its first statement), prepared once
+per connection in the dialect's statement cache (DATABASE_STATEMENT_CACHE_SIZE),
+with replica routing and pooling exactly as for ORM queries.
+
+Records are read-only snapshots: callers that change what they load must
+ask the service for the ORM instance instead.
+"""
+from typing import Optional
+
+from sqlalchemy import Table
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .models import User, Task, TaskArchive
+
+
+class Record:
+    """Attribute access like the model, plus model_dump() and the mapping protocol for encoders."""
+    __slots__ = ()
+
+    def __init__(self, row):
+        for name in self.__slots__:
+            setattr(self, name, row[name])
+
+    def keys(self):
+        return self.__slots__
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    def model_dump(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.model_dump()!r})"
+
+
+def mapped_columns(model) -> tuple[str, ...]:
+    """Column names the ORM loads for a model (computed columns it excludes stay out)."""
+    excluded = set(getattr(model, "__mapper_args__", {}).get("exclude_properties", ()))
+    return tuple(column.name for column in model.__table__.columns if column.name not in excluded)
+
+
+def select_sql(table: Table, columns: tuple[str, ...], key: str) -> str:
+    return f'SELECT {", ".join(columns)} FROM {table.name} WHERE {key} = $1'
+
+
+class UserRecord(Record):
+    __slots__ = mapped_columns(User)
+
+
+class TaskRecord(Record):
+    __slots__ = mapped_columns(Task)
+
+
+USER_BY_EMAIL_SQL = select_sql(User.__table__, UserRecord.__slots__, "email")
+USER_BY_UID_SQL = select_sql(User.__table__, UserRecord.__slots__, "uid")
+TASK_BY_UID_SQL = select_sql(Task.__table__, TaskRecord.__slots__, "uid")
+# Archived rows have every live column, so they load into the same record
+ARCHIVED_TASK_BY_UID_SQL = select_sql(TaskArchive.__table__, TaskRecord.__slots__, "uid")
+
+
+async def fetch_record(session: AsyncSession, record_class: type[Record], sql: str, *args) -> Optional[Record]:
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(sql, args)
+    row = result.first()
+    return record_class(row._mapping) if row is not None else None
+
+
+async def user_by_email(session: AsyncSession, email: str) -> Optional[UserRecord]:
+    return await fetch_record(session, UserRecord, USER_BY_EMAIL_SQL, email)
+
+
+async def user_by_uid(session: AsyncSession, uid) -> Optional[UserRecord]:
+    return await fetch_record(session, UserRecord, USER_BY_UID_SQL, uid)
+
+
+async def task_by_uid(session: AsyncSession, uid) -> Optional[TaskRecord]:
+    task = await fetch_record(session, TaskRecord, TASK_BY_UID_SQL, uid)
+    if task is None:
+        task = await fetch_record(session, TaskRecord, ARCHIVED_TASK_BY_UID_SQL, uid)
+    return task
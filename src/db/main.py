@@ -1,21 +1,139 @@
-from sqlmodel import create_engine
-from sqlalchemy.ext.asyncio import AsyncEngine
+import time
+import uuid
+
+from sqlalchemy import exc, event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlmodel import Session
+from starlette.requests import HTTPConnection
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.orm import sessionmaker
 from src.core.config import config_obj
+from src.metrics import register_metrics
+
+
+class PoolStats:
+    """Checkout counters for one engine, kept across pools (dispose() replaces the pool)."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+
+pool_stats: dict[str, PoolStats] = {}   # pool_logging_name -> stats
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long callers wait for a connection."""
+
+    def _do_get(self):
+        stats = pool_stats.setdefault(self._orig_logging_name, PoolStats())
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            stats.checkouts += 1
+            stats.wait_seconds += waited
+            stats.max_wait_seconds = max(stats.max_wait_seconds, waited)
 
-async_engine = AsyncEngine(
-    create_engine(
-        url = config_obj.DATABASE_URL,
-        echo=True
+
+def prepared_statement_name() -> str:
+    # asyncpg numbers statements per connection, and behind pgbouncer another
+    # client's statement on the same server connection may hold the number
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def connect_args() -> dict:
+    args = {
+        # SQLAlchemy prepares every statement it runs and caches them here
+        "prepared_statement_cache_size": config_obj.DATABASE_STATEMENT_CACHE_SIZE,
+        # asyncpg's own cache, for statements run on the driver directly
+        "statement_cache_size": config_obj.DATABASE_STATEMENT_CACHE_SIZE,
+    }
+    if config_obj.DATABASE_PGBOUNCER:
+        args["prepared_statement_name_func"] = prepared_statement_name
+        args["statement_cache_size"] = 0
+    return args
+
+
+def build_engine(url: str, name: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=config_obj.DATABASE_ECHO,
+        poolclass=InstrumentedPool,
+        pool_logging_name=name,
+        pool_size=config_obj.DATABASE_POOL_SIZE,
+        max_overflow=config_obj.DATABASE_MAX_OVERFLOW,
+        pool_timeout=config_obj.DATABASE_POOL_TIMEOUT,
+        pool_recycle=config_obj.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=config_obj.DATABASE_POOL_PRE_PING,
+        connect_args=connect_args(),
     )
+
+
+class PrimarySession(Session):
+    """Session on the primary; flags the request it serves when a commit wrote something."""
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _flushed(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _committed(session):
+    request_state = session.info.get("request_state")
+    if session.info.pop("wrote", False) and request_state is not None:
+        # Read by the read-your-writes middleware once the endpoint returns
+        request_state.committed_write = True
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _rolled_back(session):
+    session.info.pop("wrote", None)
+
+
+async_engine = build_engine(config_obj.DATABASE_URL, "primary")
+
+async_session_maker = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=PrimarySession,
+    expire_on_commit=False
 )
 
-async def get_session() -> AsyncEngine:
-    Session = sessionmaker(
-        bind=async_engine,
-        class_=AsyncSession,
-        expire_on_commit=False
-    )
-    async with Session() as session:
-        yield session
\ No newline at end of file
+
+async def get_session(connection: HTTPConnection) -> AsyncSession:
+    # HTTPConnection, not Request: WebSocket routes depend on this too
+    async with async_session_maker() as session:
+        session.sync_session.info["request_state"] = connection.state
+        yield session
+
+
+def engine_pool_metrics(engine: AsyncEngine, name: str) -> dict:
+    pool = engine.pool
+    stats = pool_stats.get(name) or PoolStats()
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "in_use": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "avg_wait_ms": 1000 * stats.wait_seconds / stats.checkouts if stats.checkouts else 0.0,
+        "max_wait_ms": 1000 * stats.max_wait_seconds,
+    }
+
+
+register_metrics("db_pool", lambda: engine_pool_metrics(async_engine, "primary"))
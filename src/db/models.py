@@ -1,17 +1,29 @@
-from sqlmodel import SQLModel, Field, Column, Relationship
+from sqlmodel import SQLModel, Field, Column, Relationship, Index, text
+from sqlalchemy import Computed, BigInteger, Sequence
 from datetime import datetime
 import uuid
 import sqlalchemy.dialects.postgresql as pg
 
+TASK_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+# One sequence orders every task insert, update and delete for delta sync
+TASK_CHANGE_SEQ = Sequence("task_change_seq", metadata=SQLModel.metadata)
+
 
 class User(SQLModel, table=True):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at", "created_at"),
+    )
 
     uid: uuid.UUID = Field(
         sa_column=Column(pg.UUID, primary_key=True, default=uuid.uuid4, nullable=False)
     )
     username: str
-    email: str
+    email: str = Field(unique=True, index=True)
     password_hash: str
     role: str = Field(default="user")
     is_verified: bool = Field(default=False)
@@ -31,6 +43,30 @@ class User(SQLModel, table=True):
 
 class Task(SQLModel, table=True):
     __tablename__ = "tasks"
+    # Every list query orders by (created_at, uid) for keyset pagination, so each
+    # index ends with those columns and can serve the ORDER BY ... LIMIT directly.
+    __table_args__ = (
+        Index("ix_tasks_created_at_uid", "created_at", "uid"),
+        Index("ix_tasks_created_by_created_at_uid", "created_by", "created_at", "uid"),
+        Index(
+            "ix_tasks_assigned_to_created_at_uid", "assigned_to", "created_at", "uid",
+            postgresql_where=text("assigned_to IS NOT NULL")
+        ),
+        Index("ix_tasks_status_created_at_uid", "status", "created_at", "uid"),
+        Index("ix_tasks_priority_created_at_uid", "priority", "created_at", "uid"),
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_tasks_open_due_date", "due_date", postgresql_where=text("status <> 'completed'")),
+        # Tasks still waiting for a due-date reminder; rows leave it once reminded
+        Index(
+            "ix_tasks_reminder_due_date_uid", "due_date", "uid",
+            postgresql_where=text("status <> 'completed' AND reminder_sent_at IS NULL")
+        ),
+        # Lets the archiver find the oldest completed tasks without a scan
+        Index("ix_tasks_completed_updated_at", "updated_at", postgresql_where=text("status = 'completed'")),
+        Index("ix_tasks_change_seq", "change_seq"),
+    )
+    # search_vector lives on the table for full-text search but is never loaded
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
 
     uid: uuid.UUID = Field(
         sa_column=Column(pg.UUID, primary_key=True, default=uuid.uuid4, nullable=False)
@@ -40,8 +76,19 @@ class Task(SQLModel, table=True):
     status: str = Field(default="pending")      # pending, in_progress, completed
     priority: str = Field(default="medium")     # low, medium, high
     due_date: datetime | None = None
-    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP(timezone=True), default=datetime.now))
-    updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP(timezone=True), default=datetime.now))
+    reminder_sent_at: datetime | None = None
+    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP(timezone=True), default=datetime.utcnow))
+    updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP(timezone=True), default=datetime.utcnow))
+    version: int = Field(default=1, sa_column_kwargs={"server_default": text("1")})
+    change_seq: int | None = Field(
+        default=None,
+        sa_column=Column(BigInteger, server_default=TASK_CHANGE_SEQ.next_value(), nullable=False)
+    )
+    search_vector: str | None = Field(
+        default=None,
+        exclude=True,
+        sa_column=Column(pg.TSVECTOR, Computed(TASK_SEARCH_VECTOR, persisted=True))
+    )
 
     # Foreign Keys
     created_by: uuid.UUID = Field(foreign_key="users.uid")
@@ -56,3 +103,66 @@ class Task(SQLModel, table=True):
         back_populates="assigned_tasks",
         sa_relationship_kwargs={"foreign_keys": "[Task.assigned_to]"}
     )
+
+
+class TaskArchive(SQLModel, table=True):
+    """Completed tasks moved out of tasks by the archiver; same columns, read-only."""
+    __tablename__ = "tasks_archive"
+    __table_args__ = (
+        Index("ix_tasks_archive_created_at_uid", "created_at", "uid"),
+        Index("ix_tasks_archive_created_by_created_at_uid", "created_by", "created_at", "uid"),
+        Index(
+            "ix_tasks_archive_assigned_to_created_at_uid", "assigned_to", "created_at", "uid",
+            postgresql_where=text("assigned_to IS NOT NULL")
+        ),
+    )
+
+    uid: uuid.UUID = Field(
+        sa_column=Column(pg.UUID, primary_key=True, nullable=False)
+    )
+    title: str
+    description: str
+    status: str
+    priority: str
+    due_date: datetime | None = None
+    reminder_sent_at: datetime | None = None
+    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False))
+    updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False))
+    version: int
+    change_seq: int | None = Field(default=None, sa_column=Column(BigInteger, nullable=True))
+    archived_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"))
+    )
+
+    # No foreign keys: archived rows keep the uids of users deleted since
+    created_by: uuid.UUID
+    assigned_to: uuid.UUID | None = None
+
+
+class TaskTombstone(SQLModel, table=True):
+    """Left behind by a task delete, or by a reassignment that takes the task
+    away from its previous assignee (revoked), so delta sync can report it."""
+    __tablename__ = "task_tombstones"
+
+    # A task can leave several (revoked more than once, then deleted)
+    change_seq: int | None = Field(
+        default=None,
+        sa_column=Column(BigInteger, primary_key=True, server_default=TASK_CHANGE_SEQ.next_value(), nullable=False)
+    )
+    uid: uuid.UUID = Field(sa_column=Column(pg.UUID, nullable=False))
+    # Kept (without foreign keys) so visibility can be checked after the task is gone
+    created_by: uuid.UUID
+    assigned_to: uuid.UUID | None = None     # the previous assignee for a revoked task
+    revoked: bool = Field(default=False, sa_column_kwargs={"server_default": text("false")})
+    deleted_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"))
+    )
+
+
+class TaskCounter(SQLModel, table=True):
+    """Task counts per (dimension, bucket), kept in step by every task write."""
+    __tablename__ = "task_counters"
+
+    dimension: str = Field(primary_key=True)    # status, priority, assignee
+    bucket: str = Field(primary_key=True)
+    count: int = Field(default=0)
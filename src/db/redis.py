@@ -1,22 +1,131 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
 from redis.asyncio import Redis
+from redis.exceptions import RedisError
 from src.core.config import config_obj
+from src.metrics import register_metrics
 
 JTI_EXPIRY = 3600
+BLOCKLIST_PREFIX = "blocklist:jti:"
+# Revocations made before BLOCKLIST_PREFIX are keyed by the bare JTI (a uuid4).
+# Both reads of these can go once JTI_EXPIRY has passed since that deploy.
+LEGACY_BLOCKLIST_MATCH = "????????-????-????-????-????????????"
+BLOCKLIST_CHANNEL = "blocklist:revoked"
+BLOCKLIST_RETRY_SECONDS = 1
+BLOCKLIST_PRUNE_SIZE = 1024     # expired entries are dropped once the copy grows past this
+
+logger = logging.getLogger(__name__)
 
-token_blocklist = Redis(
+redis_client = Redis(
     host=config_obj.REDIS_HOST,
     port=config_obj.REDIS_PORT,
     db=0,
     decode_responses=True
 )
 
+token_blocklist = redis_client
+
+
+class RevokedTokens:
+    """Per-worker copy of the JTI blocklist, so a check needs no round trip.
+
+    The copy is loaded from Redis once subscribed to BLOCKLIST_CHANNEL and is
+    kept current by what add_jti_to_blocklist publishes. Until it is synced
+    (startup, or after the subscription dropped) checks go to Redis.
+    """
+
+    def __init__(self):
+        self.revoked: dict[str, float] = {}     # jti -> monotonic expiry
+        self.synced = False
+        self.prune_at = BLOCKLIST_PRUNE_SIZE
+        self.listener: Optional[asyncio.Task] = None
+        self.local_checks = 0
+        self.redis_checks = 0
+
+    def start(self) -> None:
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.create_task(self.listen())
+
+    def add(self, jti: str, ttl: float = JTI_EXPIRY) -> None:
+        self.revoked[jti] = time.monotonic() + ttl
+        if len(self.revoked) > self.prune_at:
+            now = time.monotonic()
+            self.revoked = {j: expires_at for j, expires_at in self.revoked.items() if expires_at > now}
+            self.prune_at = max(BLOCKLIST_PRUNE_SIZE, 2 * len(self.revoked))
+
+    async def contains(self, jti: str) -> bool:
+        self.start()
+        if not self.synced:
+            self.redis_checks += 1
+            return await token_blocklist.exists(BLOCKLIST_PREFIX + jti, jti) > 0
+
+        self.local_checks += 1
+        expires_at = self.revoked.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            del self.revoked[jti]
+            return False
+        return True
+
+    async def resync(self) -> None:
+        revoked = {}
+        now = time.monotonic()
+        async for key in token_blocklist.scan_iter(match=BLOCKLIST_PREFIX + "*", count=1000):
+            ttl = await token_blocklist.ttl(key)
+            if ttl > 0:
+                revoked[key.removeprefix(BLOCKLIST_PREFIX)] = now + ttl
+        async for key in token_blocklist.scan_iter(match=LEGACY_BLOCKLIST_MATCH, count=1000):
+            ttl = await token_blocklist.ttl(key)
+            if ttl > 0:
+                # Carried over under the prefix, so the legacy key can just expire
+                await token_blocklist.set(BLOCKLIST_PREFIX + key, "", ex=ttl, nx=True)
+                revoked[key] = now + ttl
+        self.revoked = revoked
+
+    async def listen(self) -> None:
+        while True:
+            pubsub = token_blocklist.pubsub()
+            try:
+                # Subscribe before loading, so nothing revoked in between is missed
+                await pubsub.subscribe(BLOCKLIST_CHANNEL)
+                await self.resync()
+                self.synced = True
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.add(message["data"])
+            except RedisError:
+                logger.warning("Blocklist subscription lost, checking Redis until resynced")
+                self.synced = False
+                await asyncio.sleep(BLOCKLIST_RETRY_SECONDS)
+            finally:
+                await pubsub.aclose()
+
+    def metrics(self) -> dict:
+        checks = self.local_checks + self.redis_checks
+        return {
+            "synced": self.synced,
+            "revoked": len(self.revoked),
+            "local_checks": self.local_checks,
+            "redis_checks": self.redis_checks,
+            "redis_check_ratio": self.redis_checks / checks if checks else 0.0,
+        }
+
+
+revoked_tokens = RevokedTokens()
+register_metrics("token_blocklist", revoked_tokens.metrics)
+
+
 async def add_jti_to_blocklist(jti: str) -> None:
-    await token_blocklist.set(
-        name=jti,
-        value="",
-        ex=JTI_EXPIRY
-    )
+    revoked_tokens.add(jti)
+    async with token_blocklist.pipeline(transaction=True) as pipe:
+        pipe.set(name=BLOCKLIST_PREFIX + jti, value="", ex=JTI_EXPIRY)
+        pipe.publish(BLOCKLIST_CHANNEL, jti)
+        await pipe.execute()
+
 
 async def token_in_blocklist(jti: str) -> bool:
-    value = await token_blocklist.get(jti)
-    return value is not None
+    return await revoked_tokens.contains(jti)
@@ -0,0 +1,211 @@
+import asyncio
+import itertools
+import logging
+from typing import Optional
+
+from fastapi import Request
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth.utils import decode_token
+from src.core.config import config_obj
+from src.metrics import register_metrics
+from .main import async_session_maker, build_engine, engine_pool_metrics
+from .redis import redis_client
+
+PIN_PRIMARY_PREFIX = "db:pin_primary:"
+REPLICA_CHECK_TIMEOUT_SECONDS = 2
+
+# Seconds the replica is behind the primary; 0 when it has replayed all it
+# received, NULL when it is not streaming (it cannot know what it is missing).
+# Without pg_read_all_stats the receiver's status reads NULL, but its row is
+# still there only while the receiver runs.
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver WHERE COALESCE(status, 'streaming') = 'streaming'
+        ) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.engine = build_engine(url, name)
+        self.session_maker = async_sessionmaker(
+            bind=self.engine, class_=AsyncSession, expire_on_commit=False, info={"replica": name}
+        )
+        self.healthy = False    # until the first check says otherwise
+        self.lag_seconds: Optional[float] = None
+        self.sessions = 0
+
+    async def check(self, max_lag: float) -> None:
+        try:
+            async with self.engine.connect() as connection:
+                lag = await asyncio.wait_for(
+                    connection.scalar(REPLICA_LAG_SQL), REPLICA_CHECK_TIMEOUT_SECONDS
+                )
+        except Exception:
+            if self.healthy:
+                logger.warning("Replica %s unreachable, taking it out of rotation", self.name)
+            self.healthy, self.lag_seconds = False, None
+            return
+
+        if lag is None:
+            if self.healthy:
+                logger.warning("Replica %s is not streaming from the primary, taking it out of rotation", self.name)
+            self.healthy, self.lag_seconds = False, None
+            return
+
+        self.lag_seconds = float(lag)
+        healthy = self.lag_seconds <= max_lag
+        if healthy != self.healthy:
+            logger.warning(
+                "Replica %s %s rotation (lag %.1fs)",
+                self.name, "back in" if healthy else "taken out of", self.lag_seconds
+            )
+        self.healthy = healthy
+
+
+class ReplicaRouter:
+    """Sends reads round-robin to replicas that are reachable and within the lag limit.
+
+    Reads go to the primary when no replica qualifies, and for DATABASE_READ_YOUR_WRITES_SECONDS
+    after a user commits a write (pin_primary), so users always see their own writes.
+    Everyone else may read data up to DATABASE_REPLICA_MAX_LAG_SECONDS old.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        max_lag: float = config_obj.DATABASE_REPLICA_MAX_LAG_SECONDS,
+        check_interval: float = config_obj.DATABASE_REPLICA_CHECK_INTERVAL_SECONDS,
+        pin_seconds: int = config_obj.DATABASE_READ_YOUR_WRITES_SECONDS,
+    ):
+        self.replicas = [Replica(f"replica{i}", url) for i, url in enumerate(urls)]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.pin_seconds = pin_seconds
+        self.turn = itertools.count()
+        self.checker: Optional[asyncio.Task] = None
+        self.primary_reads = 0
+        self.pinned_reads = 0
+        self.redis_errors = 0
+
+    # --------------------------------------------------
+    # HEALTH (each worker checks for itself)
+    # --------------------------------------------------
+    def start(self) -> None:
+        if self.replicas and (self.checker is None or self.checker.done()):
+            self.checker = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.checker is None:
+            return
+        self.checker.cancel()
+        try:
+            await self.checker
+        except asyncio.CancelledError:
+            pass
+        self.checker = None
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.gather(*(replica.check(self.max_lag) for replica in self.replicas))
+            await asyncio.sleep(self.check_interval)
+
+    # --------------------------------------------------
+    # READ-YOUR-WRITES
+    # --------------------------------------------------
+    @staticmethod
+    def pin_key(user_uid) -> str:
+        return f"{PIN_PRIMARY_PREFIX}{user_uid}"
+
+    async def pin_primary(self, user_uid) -> None:
+        if not self.replicas:
+            return
+        try:
+            await redis_client.set(self.pin_key(user_uid), 1, ex=self.pin_seconds)
+        except RedisError:
+            self.redis_errors += 1
+
+    async def is_pinned(self, user_uid) -> bool:
+        try:
+            return await redis_client.exists(self.pin_key(user_uid)) > 0
+        except RedisError:
+            # Can't tell, so don't risk showing the user stale data
+            self.redis_errors += 1
+            return True
+
+    # --------------------------------------------------
+    # ROUTING
+    # --------------------------------------------------
+    async def choose(self, user_uid=None) -> Optional[Replica]:
+        """The replica to read from, or None for the primary."""
+        self.start()
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            self.primary_reads += 1
+            return None
+        if user_uid is not None and await self.is_pinned(user_uid):
+            self.pinned_reads += 1
+            return None
+        replica = healthy[next(self.turn) % len(healthy)]
+        replica.sessions += 1
+        return replica
+
+    async def session(self, user_uid=None) -> AsyncSession:
+        replica = await self.choose(user_uid)
+        if replica is None:
+            return async_session_maker()
+        return replica.session_maker()
+
+    def metrics(self) -> dict:
+        return {
+            "primary_reads": self.primary_reads,
+            "pinned_reads": self.pinned_reads,
+            "redis_errors": self.redis_errors,
+            "replicas": {
+                replica.name: {
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag_seconds,
+                    "sessions": replica.sessions,
+                    "pool": engine_pool_metrics(replica.engine, replica.name),
+                }
+                for replica in self.replicas
+            },
+        }
+
+
+replica_router = ReplicaRouter([url.strip() for url in config_obj.DATABASE_REPLICA_URLS.split(",") if url.strip()])
+register_metrics("db_replicas", replica_router.metrics)
+
+
+def is_replica_session(session: AsyncSession) -> bool:
+    return "replica" in session.sync_session.info
+
+
+def request_user_uid(request: Request) -> Optional[str]:
+    """The user_uid claim of the request's bearer token, if it carries a valid one."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    token_data = decode_token(token)     # cached, so this repeats no verification work
+    if token_data is None:
+        return None
+    return token_data["user"].get("user_uid")
+
+
+async def get_read_session(request: Request) -> AsyncSession:
+    """Session for read-only endpoints: a healthy replica, or the primary when the caller just wrote."""
+    async with await replica_router.session(request_user_uid(request)) as session:
+        yield session
@@ -51,6 +51,18 @@ class EmployeeNotFound(TaskCollabException):
     """Employee Not found"""
     pass
 
+class TaskVersionConflict(TaskCollabException):
+    """Task was changed by someone else since the version the user read"""
+    pass
+
+class InvalidCursor(TaskCollabException):
+    """User has provided a malformed pagination cursor"""
+    pass
+
+class InvalidIfMatch(TaskCollabException):
+    """User has provided an If-Match header that names no task version"""
+    pass
+
 class AccountNotVerified(Exception):
     """Account Not yet verified"""
     pass
@@ -196,6 +208,42 @@ def register_error_handlers(app: FastAPI):
         ),
     )
 
+    app.add_exception_handler(
+        TaskVersionConflict,
+        create_error_handler(
+            status_code=status.HTTP_409_CONFLICT,
+            initial_detail={
+                "message": "Task was modified by someone else",
+                "error_code": "task_version_conflict",
+                "resolution": "Fetch the task again and reapply your changes"
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        InvalidCursor,
+        create_error_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Invalid pagination cursor",
+                "error_code": "invalid_cursor",
+                "resolution": "Use the next_cursor returned by a previous page"
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        InvalidIfMatch,
+        create_error_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Invalid If-Match header",
+                "error_code": "invalid_if_match",
+                "resolution": "Send the ETag returned by a previous read of the task, or *"
+            },
+        ),
+    )
+
     app.add_exception_handler(
         AccountNotVerified,
         create_error_handler(
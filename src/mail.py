@@ -1,6 +1,12 @@
-from fastapi_mail import FastMail, ConnectionConfig, MessageSchema, MessageType
+from fastapi_mail import ConnectionConfig
+from jinja2 import Environment, FileSystemLoader
 from src.core.config import config_obj
+from src.db.redis import redis_client
+from src.metrics import register_metrics
 from pathlib import Path
+import json
+import time
+import uuid
 
 BASE_DIR = Path(__file__).resolve().parent
 mail_config = ConnectionConfig(
@@ -17,12 +23,53 @@ mail_config = ConnectionConfig(
     TEMPLATE_FOLDER=Path(BASE_DIR,'templates')
 )
 
-mail = FastMail(
-    config = mail_config
-)
+# Autoescaped: task titles and usernames are user input
+mail_templates = Environment(loader=FileSystemLoader(mail_config.TEMPLATE_FOLDER), autoescape=True)
+
+# --------------------------------------------------
+# Outbound queue (drained by src/mail_worker.py)
+# --------------------------------------------------
+MAIL_QUEUE_KEY = "mail:queue"               # list, LPUSH in / worker moves from the right
+MAIL_PROCESSING_KEY = "mail:processing"     # list of messages the worker holds right now
+MAIL_RETRY_KEY = "mail:retry"               # sorted set, scored by when to try again
+MAIL_DEAD_LETTER_KEY = "mail:dead"          # list of messages that ran out of attempts
+
+
+def create_message(recipients:list[str], subject:str, body:str) -> dict:
+    return {
+        "id": uuid.uuid4().hex,
+        "recipients": recipients,
+        "subject": subject,
+        "body": body,
+        "attempts": 0,
+        "queued_at": time.time(),
+    }
+
+
+async def enqueue_messages(*messages: dict) -> None:
+    """Hands messages to the mail worker; returns as soon as Redis has them."""
+    if not messages:
+        return
+    await redis_client.lpush(MAIL_QUEUE_KEY, *(json.dumps(message) for message in messages))
+
+
+async def enqueue_email(recipients:list[str], subject:str, body:str) -> None:
+    await enqueue_messages(create_message(recipients, subject, body))
+
+
+async def mail_queue_metrics() -> dict:
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.llen(MAIL_QUEUE_KEY)
+        pipe.llen(MAIL_PROCESSING_KEY)
+        pipe.zcard(MAIL_RETRY_KEY)
+        pipe.llen(MAIL_DEAD_LETTER_KEY)
+        queued, processing, retrying, dead = await pipe.execute()
+    return {
+        "queued": queued,
+        "processing": processing,
+        "retrying": retrying,
+        "dead_letter": dead,
+    }
+
 
-def create_message(recipients:list[str], subject:str, body:str):
-    message = MessageSchema(
-        recipients=recipients, subject=subject, body=body, subtype=MessageType.html
-    )
-    return message
\ No newline at end of file
+register_metrics("mail_queue", mail_queue_metrics)
@@ -0,0 +1,191 @@
+"""Outbound mail worker: drains the Redis mail queue over one reused SMTP connection.
+
+Run it next to the API as its own process:
+
+    python -m src.mail_worker
+
+Delivery is at least once. A message is moved to mail:processing while it is
+sent and removed only afterwards, so messages left there by a crashed worker
+are queued again when the worker starts. Run a single worker per Redis.
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Optional
+
+import aiosmtplib
+from redis.exceptions import RedisError
+
+from src.db.redis import redis_client
+from src.mail import (
+    mail_config, MAIL_QUEUE_KEY, MAIL_PROCESSING_KEY, MAIL_RETRY_KEY, MAIL_DEAD_LETTER_KEY
+)
+
+MAIL_BATCH_SIZE = 50            # messages sent back to back on one connection
+MAIL_MAX_ATTEMPTS = 6
+MAIL_RETRY_BASE_SECONDS = 5     # 5s, 10s, 20s, ... with jitter
+MAIL_RETRY_MAX_SECONDS = 900
+SMTP_IDLE_SECONDS = 30          # close the connection before servers drop it
+QUEUE_POLL_SECONDS = 1
+
+logger = logging.getLogger(__name__)
+
+
+class MailWorker:
+
+    def __init__(self):
+        self.smtp: Optional[aiosmtplib.SMTP] = None
+        self.last_used = 0.0
+        self.sent = 0
+        self.retried = 0
+        self.dead_lettered = 0
+
+    # --------------------------------------------------
+    # SMTP CONNECTION (reused across messages)
+    # --------------------------------------------------
+    async def connection(self) -> aiosmtplib.SMTP:
+        if self.smtp is not None and (
+            not self.smtp.is_connected or time.monotonic() - self.last_used > SMTP_IDLE_SECONDS
+        ):
+            await self.disconnect()
+        if self.smtp is None:
+            smtp = aiosmtplib.SMTP(
+                hostname=mail_config.MAIL_SERVER,
+                port=mail_config.MAIL_PORT,
+                use_tls=mail_config.MAIL_SSL_TLS,
+                start_tls=mail_config.MAIL_STARTTLS,
+                validate_certs=mail_config.VALIDATE_CERTS,
+                username=mail_config.MAIL_USERNAME if mail_config.USE_CREDENTIALS else None,
+                password=mail_config.MAIL_PASSWORD.get_secret_value() if mail_config.USE_CREDENTIALS else None,
+            )
+            await smtp.connect()
+            self.smtp = smtp
+        return self.smtp
+
+    async def disconnect(self) -> None:
+        if self.smtp is None:
+            return
+        try:
+            await self.smtp.quit()
+        except aiosmtplib.SMTPException:
+            self.smtp.close()
+        self.smtp = None
+
+    @staticmethod
+    def build_email(message: dict) -> EmailMessage:
+        email = EmailMessage()
+        email["From"] = formataddr((mail_config.MAIL_FROM_NAME, mail_config.MAIL_FROM))
+        email["To"] = ", ".join(message["recipients"])
+        email["Subject"] = message["subject"]
+        email.set_content(message["body"], subtype="html")
+        return email
+
+    async def deliver(self, message: dict) -> None:
+        email = self.build_email(message)
+        smtp = await self.connection()
+        try:
+            await smtp.send_message(email)
+        except aiosmtplib.SMTPServerDisconnected:
+            # A connection that went stale between messages is not the message's fault
+            await self.disconnect()
+            smtp = await self.connection()
+            await smtp.send_message(email)
+        self.last_used = time.monotonic()
+
+    # --------------------------------------------------
+    # QUEUE
+    # --------------------------------------------------
+    async def recover(self) -> None:
+        """Queues again whatever a previous worker was holding when it stopped.
+
+        They go ahead of the queue, oldest (rightmost) sent first.
+        """
+        while await redis_client.lmove(MAIL_PROCESSING_KEY, MAIL_QUEUE_KEY, "LEFT", "RIGHT"):
+            pass
+
+    async def promote_due_retries(self) -> None:
+        due = await redis_client.zrangebyscore(MAIL_RETRY_KEY, 0, time.time(), start=0, num=MAIL_BATCH_SIZE)
+        for raw in due:
+            if await redis_client.zrem(MAIL_RETRY_KEY, raw):
+                await redis_client.lpush(MAIL_QUEUE_KEY, raw)
+
+    async def next_batch(self) -> list[str]:
+        raw = await redis_client.blmove(MAIL_QUEUE_KEY, MAIL_PROCESSING_KEY, QUEUE_POLL_SECONDS, "RIGHT", "LEFT")
+        if raw is None:
+            return []
+        batch = [raw]
+        while len(batch) < MAIL_BATCH_SIZE:
+            raw = await redis_client.lmove(MAIL_QUEUE_KEY, MAIL_PROCESSING_KEY, "RIGHT", "LEFT")
+            if raw is None:
+                break
+            batch.append(raw)
+        return batch
+
+    async def dead_letter(self, message: dict) -> None:
+        await redis_client.lpush(MAIL_DEAD_LETTER_KEY, json.dumps(message))
+        self.dead_lettered += 1
+
+    async def fail(self, message: dict, error: Exception, permanent: bool) -> None:
+        message["attempts"] = message.get("attempts", 0) + 1
+        message["last_error"] = str(error)
+        if permanent or message["attempts"] >= MAIL_MAX_ATTEMPTS:
+            logger.error("Dead-lettering mail %s to %s: %s", message.get("id"), message.get("recipients"), error)
+            await self.dead_letter(message)
+            return
+
+        delay = min(MAIL_RETRY_BASE_SECONDS * 2 ** (message["attempts"] - 1), MAIL_RETRY_MAX_SECONDS)
+        delay *= random.uniform(0.8, 1.2)
+        logger.warning("Mail %s failed (attempt %d), retrying in %.0fs: %s", message.get("id"), message["attempts"], delay, error)
+        await redis_client.zadd(MAIL_RETRY_KEY, {json.dumps(message): time.time() + delay})
+        self.retried += 1
+
+    async def process(self, raw: str) -> None:
+        message = None
+        try:
+            message = json.loads(raw)
+            await self.deliver(message)
+            self.sent += 1
+        except aiosmtplib.SMTPResponseException as e:
+            # 5xx means the server will never take this message as it is
+            await self.fail(message, e, permanent=e.code >= 500)
+        except (aiosmtplib.SMTPException, OSError) as e:
+            await self.disconnect()
+            await self.fail(message, e, permanent=False)
+        except Exception as e:
+            # Malformed: sending it again would fail the same way, and leaving it
+            # in mail:processing would have recover() queue it forever
+            logger.exception("Dead-lettering mail that cannot be sent")
+            if not isinstance(message, dict):
+                message = {"raw": raw}
+            message["last_error"] = str(e)
+            await self.dead_letter(message)
+        await redis_client.lrem(MAIL_PROCESSING_KEY, 1, raw)
+
+    async def run(self) -> None:
+        await self.recover()
+        while True:
+            try:
+                await self.promote_due_retries()
+                batch = await self.next_batch()
+                if not batch:
+                    if self.smtp is not None and time.monotonic() - self.last_used > SMTP_IDLE_SECONDS:
+                        await self.disconnect()
+                    continue
+                for raw in batch:
+                    await self.process(raw)
+            except RedisError:
+                logger.warning("Mail queue unavailable, retrying")
+                await asyncio.sleep(QUEUE_POLL_SECONDS)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(MailWorker().run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import inspect
+from typing import Awaitable, Callable, Union
+
+# name -> zero-argument callable returning (or awaiting to) a dict of counters/gauges
+metric_providers: dict[str, Callable[[], Union[dict, Awaitable[dict]]]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], Union[dict, Awaitable[dict]]]) -> None:
+    metric_providers[name] = provider
+
+
+async def collect_metrics() -> dict:
+    metrics = {}
+    for name, provider in metric_providers.items():
+        value = provider()
+        if inspect.isawaitable(value):
+            value = await value
+        metrics[name] = value
+    return metrics
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Depends
+from src.auth.dependencies import RoleChecker
+from . import collect_metrics
+
+metrics_router = APIRouter()
+role_checker = RoleChecker(["admin"])
+
+
+@metrics_router.get("/", dependencies=[Depends(role_checker)])
+async def get_metrics():
+    return await collect_metrics()
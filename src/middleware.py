@@ -5,6 +5,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 import time
 import logging
+from src.db.replicas import replica_router, request_user_uid
 
 
 logger = logging.getLogger('uvicorn.access')
@@ -29,6 +30,17 @@ def register_middleware(app: FastAPI):
         message = f"{request.client.host}:{request.client.port} - {request.method} - {request.url.path} - {response.status_code} completed after {processing_time}s"
         print(message)
         return response
+
+    @app.middleware('http')
+    async def read_your_writes(request:Request, call_next):
+        response = await call_next(request)
+        # Set by the primary session when this request committed a write;
+        # pinned before the response goes out, so the caller's next read sees it
+        if getattr(request.state, "committed_write", False):
+            user_uid = request_user_uid(request)
+            if user_uid is not None:
+                await replica_router.pin_primary(user_uid)
+        return response
     
     # @app.middleware('http')
     # async def authorization(request:Request,call_next):
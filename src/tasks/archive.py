@@ -0,0 +1,104 @@
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, union_all
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.config import config_obj
+from src.db.main import async_session_maker
+from src.db.models import Task, TaskArchive
+from src.metrics import register_metrics
+from .cache import bump_task_set_versions
+from .events import task_event, publish_task_events
+from .jobs import PeriodicJob
+
+ARCHIVE_LEASE_KEY = "tasks:archive:lease"
+ARCHIVE_BATCH_SIZE = 1000       # tasks moved per transaction
+ARCHIVE_MAX_BATCHES = 50        # caps a tick's work; the rest waits for the next tick
+
+# Columns tasks and tasks_archive share (search_vector is regenerated, never copied)
+ARCHIVE_COLUMNS = [c.name for c in TaskArchive.__table__.columns if c.name != "archived_at"]
+
+logger = logging.getLogger(__name__)
+
+
+def task_source(include_archived: bool = False):
+    """Task, or a Task alias over tasks UNION ALL tasks_archive."""
+    if not include_archived:
+        return Task
+    hot = select(*(Task.__table__.c[name] for name in ARCHIVE_COLUMNS))
+    cold = select(*(TaskArchive.__table__.c[name] for name in ARCHIVE_COLUMNS))
+    return aliased(Task, union_all(hot, cold).subquery("all_tasks"))
+
+
+class TaskArchiver(PeriodicJob):
+    """Moves completed tasks untouched for archive_after into tasks_archive.
+
+    Each batch is one DELETE ... RETURNING feeding an INSERT, so a task is
+    always in exactly one of the two tables. Task counters are left alone:
+    they count archived tasks too, and reconcile counts both tables.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: int = config_obj.TASK_ARCHIVE_INTERVAL_SECONDS,
+        archive_after: timedelta = timedelta(days=config_obj.TASK_ARCHIVE_AFTER_DAYS),
+    ):
+        super().__init__(ARCHIVE_LEASE_KEY, interval_seconds)
+        self.archive_after = archive_after
+        self.archived_tasks = 0
+
+    async def run_once(self) -> int:
+        """Archives batches until none are left or the tick's cap is hit; returns tasks moved."""
+        moved = 0
+        cutoff = datetime.utcnow() - self.archive_after
+        async with async_session_maker() as session:
+            for _ in range(ARCHIVE_MAX_BATCHES):
+                count = await self.archive_batch(session, cutoff)
+                moved += count
+                if count < ARCHIVE_BATCH_SIZE:
+                    break
+
+        self.archived_tasks += moved
+        return moved
+
+    async def archive_batch(self, session: AsyncSession, cutoff: datetime) -> int:
+        # SKIP LOCKED leaves tasks that are being edited right now for a later tick
+        batch = (
+            select(Task.uid)
+            .where(Task.status == "completed", Task.updated_at < cutoff)
+            .order_by(Task.updated_at)
+            .limit(ARCHIVE_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        moved = (
+            delete(Task)
+            .where(Task.uid.in_(batch.scalar_subquery()))
+            .returning(*(Task.__table__.c[name] for name in ARCHIVE_COLUMNS))
+            .cte("moved")
+        )
+        statement = (
+            insert(TaskArchive)
+            .from_select(ARCHIVE_COLUMNS, select(*(moved.c[name] for name in ARCHIVE_COLUMNS)))
+            .returning(*TaskArchive.__table__.c)
+        )
+        result = await session.execute(statement)
+        tasks = result.all()
+        await session.commit()
+
+        if tasks:
+            # Archived tasks leave the default lists
+            await bump_task_set_versions(*{
+                uid for task in tasks for uid in (task.created_by, task.assigned_to)
+            })
+            await publish_task_events(*(task_event("archived", task) for task in tasks))
+        return len(tasks)
+
+    def metrics(self) -> dict:
+        return {**super().metrics(), "archived_tasks": self.archived_tasks}
+
+
+task_archiver = TaskArchiver()
+register_metrics("task_archive", task_archiver.metrics)
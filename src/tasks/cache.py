@@ -0,0 +1,165 @@
+import uuid
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.core.cache import LRUCache
+from src.db.redis import redis_client
+from src.metrics import register_metrics
+
+TASK_CACHE_TTL = 300          # seconds a serialized task lives in Redis
+LOCAL_CACHE_TTL = 5           # short, so other workers' writes show up quickly
+LOCAL_CACHE_SIZE = 1024
+DELETED_TASK_VERSION = 2 ** 53  # outranks any fill of a task that is gone
+
+# Entries carry the task version, and invalidation leaves a version-only
+# marker instead of deleting the key. A reader that loaded the row before a
+# write commits cannot then put the old version back after the invalidation.
+FILL_SCRIPT = """
+local current = tonumber(redis.call('HGET', KEYS[1], 'version'))
+if current and current > tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'version', ARGV[1], 'etag', ARGV[2], 'body', ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+INVALIDATE_SCRIPT = """
+local ttl = ARGV[#ARGV]
+for i, key in ipairs(KEYS) do
+    local current = tonumber(redis.call('HGET', key, 'version'))
+    if not current or current < tonumber(ARGV[i]) then
+        redis.call('DEL', key)
+        redis.call('HSET', key, 'version', ARGV[i])
+        redis.call('EXPIRE', key, ttl)
+    end
+end
+return 0
+"""
+
+
+class TaskCache:
+    """Read-through cache of (etag, TaskResponse JSON) pairs: local LRU, then Redis."""
+
+    def __init__(self):
+        self.local = LRUCache(LOCAL_CACHE_SIZE, LOCAL_CACHE_TTL)
+        self.fill_script = redis_client.register_script(FILL_SCRIPT)
+        self.invalidate_script = redis_client.register_script(INVALIDATE_SCRIPT)
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.stale_fills = 0
+        self.invalidations = 0
+        self.redis_errors = 0
+
+    @staticmethod
+    def key(task_id: str) -> str:
+        return f"task:{task_id}"
+
+    async def get(self, task_id: str) -> Optional[tuple[str, str]]:
+        key = self.key(task_id)
+        value = self.local.get(key)
+        if value is not None:
+            self.local_hits += 1
+            return value
+
+        try:
+            entry = await redis_client.hgetall(key)
+        except RedisError:
+            self.redis_errors += 1
+            entry = {}
+
+        if "body" not in entry:
+            # Missing, only the marker an invalidation left, or Redis is down
+            self.misses += 1
+            return None
+
+        self.redis_hits += 1
+        value = (entry["etag"], entry["body"])
+        self.local.set(key, value)
+        return value
+
+    async def set(self, task_id: str, version: int, etag: str, body: str) -> None:
+        """Fills the cache unless a newer version was written (or invalidated) meanwhile."""
+        key = self.key(task_id)
+        try:
+            filled = await self.fill_script(keys=[key], args=[version, etag, body, TASK_CACHE_TTL])
+        except RedisError:
+            self.redis_errors += 1
+            filled = True
+        if filled:
+            self.local.set(key, (etag, body))
+        else:
+            self.stale_fills += 1
+
+    async def invalidate(self, *tasks, deleted: bool = False) -> None:
+        """Called after commit with the written tasks, so fills of older versions are refused."""
+        if not tasks:
+            return
+        keys = [self.key(task.uid) for task in tasks]
+        versions = [DELETED_TASK_VERSION if deleted else task.version for task in tasks]
+        for key in keys:
+            self.local.delete(key)
+        self.invalidations += len(keys)
+        try:
+            await self.invalidate_script(keys=keys, args=[*versions, TASK_CACHE_TTL])
+        except RedisError:
+            self.redis_errors += 1
+
+    def metrics(self) -> dict:
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "stale_fills": self.stale_fills,
+            "local_evictions": self.local.evictions,
+            "local_expirations": self.local.expirations,
+            "local_size": len(self.local.entries),
+            "invalidations": self.invalidations,
+            "redis_errors": self.redis_errors,
+        }
+
+
+task_cache = TaskCache()
+register_metrics("task_cache", task_cache.metrics)
+
+
+# --------------------------------------------------
+# Task set versions (cheap stamps for list ETags)
+# --------------------------------------------------
+# Each stamp is a random token rewritten on every change to the set it covers:
+# one per user for the tasks they created or are assigned, and one for the
+# whole table (what managers and admins see). Random tokens rather than
+# counters mean a stamp lost from Redis can never repeat an old value.
+TASK_SET_VERSION_ALL = "tasks:set_version:all"
+
+
+def task_set_version_key(user_uid) -> str:
+    return f"tasks:set_version:{user_uid}"
+
+
+async def bump_task_set_versions(*user_uids) -> None:
+    keys = {TASK_SET_VERSION_ALL}
+    keys.update(task_set_version_key(uid) for uid in user_uids if uid)
+    try:
+        await redis_client.mset({key: uuid.uuid4().hex for key in keys})
+    except RedisError:
+        pass
+
+
+async def get_task_set_version(current_user, show_all: bool) -> Optional[str]:
+    """Returns the stamp covering what current_user can list, or None if unknown."""
+    if current_user.role in ["user", "employee"] and not show_all:
+        key = task_set_version_key(current_user.uid)
+    else:
+        key = TASK_SET_VERSION_ALL
+
+    try:
+        version = await redis_client.get(key)
+        if version is None:
+            # Start a stamp now; this response goes out without an ETag
+            await redis_client.set(key, uuid.uuid4().hex, nx=True)
+    except RedisError:
+        return None
+    return version
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.db.redis import redis_client
+from src.metrics import register_metrics
+from .utils import serialize_task
+
+TASK_EVENTS_CHANNEL = "tasks:events"
+SUBSCRIBER_QUEUE_SIZE = 100     # events buffered per client before it is dropped as too slow
+LISTENER_RETRY_SECONDS = 1
+
+logger = logging.getLogger(__name__)
+
+
+def task_event(event_type: str, task, previous_assigned_to=None) -> dict:
+    event = {"type": f"task.{event_type}", "task": serialize_task(task)}
+    if previous_assigned_to is not None:
+        event["previous_assigned_to"] = str(previous_assigned_to)
+    return event
+
+
+async def publish_task_events(*events: dict) -> None:
+    """Publishes after commit; a Redis outage must not fail the write that already happened."""
+    if not events:
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for event in events:
+                pipe.publish(TASK_EVENTS_CHANNEL, json.dumps(event))
+            await pipe.execute()
+    except RedisError:
+        logger.warning("Could not publish %d task event(s)", len(events))
+
+
+class Subscriber:
+    def __init__(self, user_uid: str, sees_all: bool):
+        self.user_uid = user_uid
+        self.sees_all = sees_all
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+
+class TaskEventBroker:
+    """One Redis subscription per worker, fanned out to that worker's connected clients.
+
+    Subscribers are indexed by user uid so an event only touches the clients
+    allowed to see it, the same rule get_all_tasks applies: regular users see
+    tasks they created or are (or were) assigned, everyone else sees all.
+    """
+
+    def __init__(self):
+        self.by_user: dict[str, set[Subscriber]] = {}
+        self.sees_all: set[Subscriber] = set()
+        self.listener: Optional[asyncio.Task] = None
+        self.delivered = 0
+        self.dropped_subscribers = 0
+
+    def subscribe(self, current_user) -> Subscriber:
+        sees_all = current_user.role not in ["user", "employee"]
+        subscriber = Subscriber(str(current_user.uid), sees_all)
+        if sees_all:
+            self.sees_all.add(subscriber)
+        else:
+            self.by_user.setdefault(subscriber.user_uid, set()).add(subscriber)
+
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.create_task(self.listen())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        if subscriber.sees_all:
+            self.sees_all.discard(subscriber)
+            return
+        subscribers = self.by_user.get(subscriber.user_uid)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.by_user[subscriber.user_uid]
+
+    def dispatch(self, raw: str) -> None:
+        event = json.loads(raw)
+        task = event["task"]
+        targets = set(self.sees_all)
+        for uid in (task["created_by"], task["assigned_to"], event.get("previous_assigned_to")):
+            if uid:
+                targets.update(self.by_user.get(uid, ()))
+
+        for subscriber in targets:
+            try:
+                subscriber.queue.put_nowait(raw)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                subscriber.overflowed = True
+                self.dropped_subscribers += 1
+                self.unsubscribe(subscriber)
+
+    async def listen(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(TASK_EVENTS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.dispatch(message["data"])
+            except RedisError:
+                logger.warning("Task event subscription lost, retrying")
+                await asyncio.sleep(LISTENER_RETRY_SECONDS)
+            finally:
+                await pubsub.aclose()
+
+    def metrics(self) -> dict:
+        return {
+            "subscribers": len(self.sees_all) + sum(len(s) for s in self.by_user.values()),
+            "delivered": self.delivered,
+            "dropped_subscribers": self.dropped_subscribers,
+        }
+
+
+task_event_broker = TaskEventBroker()
+register_metrics("task_events", task_event_broker.metrics)
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import uuid
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.db.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """Calls run_once() every interval on whichever worker takes the Redis lease.
+
+    The lease outlives the pass on purpose: whoever takes it owns this
+    interval, so N uvicorn workers still make one pass per interval in total.
+    """
+
+    def __init__(self, lease_key: str, interval_seconds: int):
+        self.lease_key = lease_key
+        self.interval_seconds = interval_seconds
+        self.worker_id = uuid.uuid4().hex
+        self.runner: Optional[asyncio.Task] = None
+        self.ticks = 0
+        self.skipped_ticks = 0
+        self.last_tick_seconds: Optional[float] = None
+
+    # --------------------------------------------------
+    # LIFECYCLE (driven by the app lifespan)
+    # --------------------------------------------------
+    def start(self) -> None:
+        if self.runner is None or self.runner.done():
+            self.runner = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.runner is None:
+            return
+        self.runner.cancel()
+        try:
+            await self.runner
+        except asyncio.CancelledError:
+            pass
+        self.runner = None
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("%s tick failed", type(self).__name__)
+            await asyncio.sleep(self.interval_seconds)
+
+    async def acquire_lease(self) -> bool:
+        try:
+            return bool(await redis_client.set(
+                self.lease_key, self.worker_id, nx=True, ex=self.interval_seconds
+            ))
+        except RedisError:
+            logger.warning("Could not take lease %s, skipping tick", self.lease_key)
+            return False
+
+    # --------------------------------------------------
+    # TICK
+    # --------------------------------------------------
+    async def tick(self):
+        """Runs one pass if this worker holds the lease; returns run_once()'s result."""
+        if not await self.acquire_lease():
+            self.skipped_ticks += 1
+            return None
+
+        started = asyncio.get_running_loop().time()
+        result = await self.run_once()
+        self.ticks += 1
+        self.last_tick_seconds = asyncio.get_running_loop().time() - started
+        return result
+
+    async def run_once(self):
+        raise NotImplementedError
+
+    def metrics(self) -> dict:
+        return {
+            "ticks": self.ticks,
+            "skipped_ticks": self.skipped_ticks,
+            "last_tick_seconds": self.last_tick_seconds,
+        }
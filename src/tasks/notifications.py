@@ -0,0 +1,159 @@
+import json
+import logging
+import time
+
+from redis.exceptions import RedisError
+from sqlmodel import select
+
+from src.core.config import config_obj
+from src.db.main import async_session_maker
+from src.db.models import User
+from src.db.redis import redis_client
+from src.mail import mail_templates, create_message, MAIL_QUEUE_KEY
+from src.metrics import register_metrics
+from .jobs import PeriodicJob
+
+DIGEST_LEASE_KEY = "tasks:assignment_digest:lease"
+DIGEST_DUE_KEY = "notifications:assignments:due"            # sorted set of recipient uid -> flush time
+DIGEST_EVENTS_PREFIX = "notifications:assignments:events:"  # list of assigned tasks per recipient
+DIGEST_BATCH_SIZE = 500                                     # recipients flushed per pass
+
+# Queues the digests and drops the events they were built from, in one step.
+# Events added since the claim stay, and so does their recipient's due entry.
+# KEYS: mail queue, due set, then each recipient's events list
+# ARGV: message count, messages, then (recipient uid, events read) per list
+FINISH_SCRIPT = """
+local count = tonumber(ARGV[1])
+for i = 2, count + 1 do
+    redis.call('LPUSH', KEYS[1], ARGV[i])
+end
+for i = 3, #KEYS do
+    local j = count + 2 + (i - 3) * 2
+    redis.call('LTRIM', KEYS[i], tonumber(ARGV[j + 1]), -1)
+    if redis.call('LLEN', KEYS[i]) == 0 then
+        redis.call('ZREM', KEYS[2], ARGV[j])
+    end
+end
+return count
+"""
+
+logger = logging.getLogger(__name__)
+
+digest_template = mail_templates.get_template("assignment_digest.html")
+
+
+class AssignmentDigest(PeriodicJob):
+    """Coalesces task assignments into one email per recipient per window.
+
+    add() buffers an event in Redis and starts the recipient's window if it
+    is not already open. Each pass claims every recipient whose window has
+    closed, loads them in one query and queues one digest each. Events are
+    dropped only together with queueing their digest; a pass that fails
+    leaves them to be retried one window later.
+    """
+
+    def __init__(
+        self,
+        window_seconds: int = config_obj.TASK_ASSIGNMENT_DIGEST_WINDOW_SECONDS,
+        interval_seconds: int = config_obj.TASK_ASSIGNMENT_DIGEST_INTERVAL_SECONDS,
+    ):
+        super().__init__(DIGEST_LEASE_KEY, interval_seconds)
+        self.window_seconds = window_seconds
+        self.finish_script = redis_client.register_script(FINISH_SCRIPT)
+        self.events = 0
+        self.digests_sent = 0
+        self.event_failures = 0
+
+    @staticmethod
+    def events_key(user_uid) -> str:
+        return f"{DIGEST_EVENTS_PREFIX}{user_uid}"
+
+    async def add(self, *assignments) -> None:
+        """Buffers (task, assignee uid) pairs; called after the assignment is committed."""
+        if not assignments:
+            return
+        flush_at = time.time() + self.window_seconds
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for task, user_uid in assignments:
+                    pipe.rpush(self.events_key(user_uid), json.dumps({
+                        "uid": str(task.uid),
+                        "title": task.title,
+                        "due_date": str(task.due_date),
+                        "status": task.status,
+                    }))
+                    pipe.zadd(DIGEST_DUE_KEY, {str(user_uid): flush_at}, nx=True)
+                await pipe.execute()
+        except RedisError:
+            # The assignment itself is already committed; only the email is lost
+            logger.exception("Could not buffer %d assignment notification(s)", len(assignments))
+            self.event_failures += len(assignments)
+            return
+        self.events += len(assignments)
+
+    async def run_once(self) -> int:
+        """Flushes every recipient whose window has closed; returns digests queued."""
+        user_uids = await redis_client.zrangebyscore(
+            DIGEST_DUE_KEY, 0, time.time(), start=0, num=DIGEST_BATCH_SIZE
+        )
+        if not user_uids:
+            return 0
+
+        # Claimed by pushing their flush time a window out: if this pass
+        # fails before finishing, the next one after that retries them
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.zadd(DIGEST_DUE_KEY, {user_uid: time.time() + self.window_seconds for user_uid in user_uids}, xx=True)
+            for user_uid in user_uids:
+                pipe.lrange(self.events_key(user_uid), 0, -1)
+            results = await pipe.execute()
+        events_by_user = dict(zip(user_uids, results[1:]))
+
+        tasks_by_user = {}
+        for user_uid, events in events_by_user.items():
+            # A task reassigned back and forth within the window is listed once
+            tasks = {}
+            for event in map(json.loads, events):
+                tasks[event["uid"]] = event
+            if tasks:
+                tasks_by_user[user_uid] = list(tasks.values())
+
+        users = []
+        if tasks_by_user:
+            async with async_session_maker() as session:
+                result = await session.exec(
+                    select(User.uid, User.username, User.email).where(User.uid.in_(tasks_by_user))
+                )
+                users = result.all()
+
+        messages = []
+        for user in users:
+            tasks = tasks_by_user[str(user.uid)]
+            messages.append(create_message(
+                recipients=[user.email],
+                subject="You have been assigned a task" if len(tasks) == 1 else "You have been assigned tasks",
+                body=digest_template.render(username=user.username, tasks=tasks)
+            ))
+
+        # Recipients deleted since have their events dropped with the rest
+        await self.finish_script(
+            keys=[MAIL_QUEUE_KEY, DIGEST_DUE_KEY, *(self.events_key(user_uid) for user_uid in user_uids)],
+            args=[
+                len(messages),
+                *(json.dumps(message) for message in messages),
+                *(value for user_uid in user_uids for value in (user_uid, len(events_by_user[user_uid]))),
+            ]
+        )
+        self.digests_sent += len(messages)
+        return len(messages)
+
+    def metrics(self) -> dict:
+        return {
+            **super().metrics(),
+            "events": self.events,
+            "digests_sent": self.digests_sent,
+            "event_failures": self.event_failures,
+        }
+
+
+assignment_digest = AssignmentDigest()
+register_metrics("assignment_digest", assignment_digest.metrics)
@@ -0,0 +1,129 @@
+import logging
+from datetime import datetime, timedelta
+
+from redis.exceptions import RedisError
+from sqlalchemy import update, tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.config import config_obj
+from src.db.main import async_session_maker
+from src.db.models import Task, User
+from src.mail import mail_templates, enqueue_email
+from src.metrics import register_metrics
+from .jobs import PeriodicJob
+
+REMINDER_LEASE_KEY = "tasks:reminders:lease"
+REMINDER_BATCH_SIZE = 500       # tasks per keyset page, and at most one email per recipient per page
+REMINDER_MAX_BATCHES = 20       # caps a tick's work; the rest waits for the next tick
+
+logger = logging.getLogger(__name__)
+
+reminder_template = mail_templates.get_template("task_reminder.html")
+
+
+class DueDateReminderScheduler(PeriodicJob):
+    """Emails the assignee (or creator, if unassigned) of open tasks coming due.
+
+    Each tick walks ix_tasks_reminder_due_date_uid in (due_date, uid) keyset
+    pages. Reminded tasks get reminder_sent_at and drop out of that partial
+    index, so a tick only ever reads tasks that still need a reminder.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: int = config_obj.TASK_REMINDER_INTERVAL_SECONDS,
+        lookahead: timedelta = timedelta(hours=config_obj.TASK_REMINDER_LOOKAHEAD_HOURS),
+    ):
+        super().__init__(REMINDER_LEASE_KEY, interval_seconds)
+        self.lookahead = lookahead
+        self.reminded_tasks = 0
+        self.emails_sent = 0
+        self.email_failures = 0
+
+    async def run_once(self) -> int:
+        """One pass over the tasks coming due; returns tasks reminded."""
+        reminded = 0
+        due_before = datetime.now() + self.lookahead
+        after = None
+        async with async_session_maker() as session:
+            for _ in range(REMINDER_MAX_BATCHES):
+                tasks = await self.next_batch(session, due_before, after)
+                if not tasks:
+                    break
+                reminded += await self.remind(tasks, session)
+                after = (tasks[-1].due_date, tasks[-1].uid)
+                if len(tasks) < REMINDER_BATCH_SIZE:
+                    break
+
+        self.reminded_tasks += reminded
+        return reminded
+
+    async def next_batch(self, session: AsyncSession, due_before: datetime, after) -> list:
+        # Matches the partial index predicate so the scan is a bounded index range
+        statement = select(
+            Task.uid, Task.title, Task.status, Task.due_date, Task.created_by, Task.assigned_to
+        ).where(
+            Task.status != "completed",
+            Task.reminder_sent_at.is_(None),
+            Task.due_date <= due_before,
+        )
+        if after is not None:
+            statement = statement.where(tuple_(Task.due_date, Task.uid) > after)
+        statement = statement.order_by(Task.due_date, Task.uid).limit(REMINDER_BATCH_SIZE)
+        result = await session.exec(statement)
+        return result.all()
+
+    async def remind(self, tasks: list, session: AsyncSession) -> int:
+        tasks_by_user = {}
+        for task in tasks:
+            tasks_by_user.setdefault(task.assigned_to or task.created_by, []).append(task)
+
+        result = await session.exec(
+            select(User.uid, User.username, User.email).where(User.uid.in_(tasks_by_user))
+        )
+        now = datetime.now()
+        sent = []
+        for user in result.all():
+            user_tasks = tasks_by_user[user.uid]
+            if await self.send_reminder_email(user, user_tasks, now):
+                sent += [(task.uid, task.due_date) for task in user_tasks]
+
+        if sent:
+            # Matching the due date we reminded about leaves a task whose due
+            # date was edited meanwhile unmarked, so its new date gets a reminder
+            await session.execute(
+                update(Task)
+                .where(tuple_(Task.uid, Task.due_date).in_(sent))
+                .values(reminder_sent_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        return len(sent)
+
+    async def send_reminder_email(self, user, tasks: list, now: datetime) -> bool:
+        try:
+            await enqueue_email(
+                recipients=[user.email],
+                subject="Task due date reminder",
+                body=reminder_template.render(username=user.username, tasks=tasks, now=now)
+            )
+        except RedisError:
+            # Left unmarked, so the next tick tries this recipient again
+            logger.exception("Could not queue due-date reminder to %s", user.email)
+            self.email_failures += 1
+            return False
+        self.emails_sent += 1
+        return True
+
+    def metrics(self) -> dict:
+        return {
+            **super().metrics(),
+            "reminded_tasks": self.reminded_tasks,
+            "emails_sent": self.emails_sent,
+            "email_failures": self.email_failures,
+        }
+
+
+reminder_scheduler = DueDateReminderScheduler()
+register_metrics("task_reminders", reminder_scheduler.metrics)
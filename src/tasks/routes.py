@@ -1,13 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, WebSocket, WebSocketDisconnect
+from fastapi import status as http_status
+from fastapi.responses import StreamingResponse, Response
 from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Optional
+import asyncio
 
 from src.db.main import get_session
-from src.auth.dependencies import RoleChecker, get_current_user
+from src.db.replicas import get_read_session, is_replica_session
+from src.auth.dependencies import RoleChecker, get_current_user, get_user_from_token
 from src.db.models import User
 
-from .schemas import TaskCreate, TaskResponse, TaskUpdate
+from .schemas import (
+    TaskCreate, TaskResponse, TaskUpdate, TotalModeEnum, ExportFormatEnum,
+    TaskBulkCreate, TaskBulkUpdate, TaskBulkDelete, TaskBulkResponse, TaskChangesResponse,
+    TASK_FIELDS, TASK_EXPANSIONS, slim_task_model, slim_task_list_model
+)
 from .services import TaskService
+from .stats import TaskStatsService
+from .utils import encode_ndjson_chunk, encode_csv_chunk, make_etag, etag_matches, task_etag, parse_task_etag
+from .cache import get_task_set_version
+from .events import task_event_broker
 from src.errors import TaskNotFound
 
 # --------------------------------------------------
@@ -16,6 +28,7 @@ from src.errors import TaskNotFound
 
 task_router = APIRouter()
 task_service = TaskService()
+stats_service = TaskStatsService()
 
 # --------------------------------------------------
 # Role Checkers
@@ -24,6 +37,47 @@ task_service = TaskService()
 manager_admin = RoleChecker(["manager", "admin"])
 admin_only = RoleChecker(["admin"])
 
+BULK_SUCCESS_STATUSES = {"created", "updated", "deleted"}
+SSE_KEEPALIVE_SECONDS = 15
+
+
+def parse_name_list(value: Optional[str], allowed, kind: str) -> Optional[tuple[str, ...]]:
+    if not value:
+        return None
+    selected = tuple(dict.fromkeys(v.strip() for v in value.split(",") if v.strip()))
+    unknown = [v for v in selected if v not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {kind}: {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+        )
+    return selected or None
+
+
+def parse_fields(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    return parse_name_list(fields, TASK_FIELDS, "task field(s)")
+
+
+def parse_expand(expand: Optional[str]) -> Optional[tuple[str, ...]]:
+    return parse_name_list(expand, tuple(TASK_EXPANSIONS), "expansion(s)")
+
+
+def json_response(body: str, if_none_match: Optional[str], etag: Optional[str] = None) -> Response:
+    """JSON response with an ETag, derived from the body when none is given."""
+    etag = etag or make_etag(body)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+def bulk_response(results: list[dict]) -> dict:
+    succeeded = sum(1 for item in results if item["status"] in BULK_SUCCESS_STATUSES)
+    return {
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+    }
+
 # --------------------------------------------------
 # Routes
 # --------------------------------------------------
@@ -43,22 +97,51 @@ async def create_task(
 
 
 # GET ALL TASKS - Any logged-in user can view tasks
-@task_router.post("/all")
+@task_router.api_route("/all", methods=["GET", "POST"])
 async def get_all_tasks(
+    response: Response,
     page: int = 1,
     limit: int = 10,
     status: Optional[str] = None,
     priority: Optional[str] = None,
     assignee: Optional[str] = None,
     show_all: bool = False,  # Add this parameter
-    session: AsyncSession = Depends(get_session),
+    cursor: Optional[str] = None,
+    total: TotalModeEnum = TotalModeEnum.exact,
+    include_archived: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated task fields to return, e.g. uid,title,status"),
+    expand: Optional[str] = Query(None, description="Comma-separated user summaries to embed: creator,assignee"),
+    if_none_match: Optional[str] = Header(None),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user),  # Make this required
 ):
     # Regular users can't see all tasks even if they pass show_all=True
     if current_user.role in ["user", "employee"]:
         show_all = False
+    selected_fields = parse_fields(fields)
+    selected_expand = parse_expand(expand)
+
+    # The ETag covers the caller's task set version plus the query, so an
+    # unchanged list is answered without running it. User summaries are not
+    # covered by the set version, so expanded lists hash their body instead.
+    etag = None
+    set_version = None if selected_expand else await get_task_set_version(current_user, show_all)
+    if set_version is not None:
+        etag = make_etag(
+            set_version, current_user.uid, current_user.role,
+            page, limit, status, priority, assignee, show_all, cursor, total.value,
+            include_archived, selected_fields
+        )
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        if is_replica_session(session):
+            # The replica may not have caught up with this version yet, so a
+            # stamp issued now could outlive the stale body it was sent with
+            etag = None
+        else:
+            response.headers["ETag"] = etag
     
-    tasks, total = await task_service.get_all_tasks(
+    tasks, total_count, total_is_estimate, next_cursor = await task_service.get_all_tasks(
         session=session,
         page=page,
         limit=limit,
@@ -66,16 +149,216 @@ async def get_all_tasks(
         priority=priority,
         assignee=assignee,
         current_user=current_user,  # Pass current_user
-        show_all=show_all  # Pass show_all
+        show_all=show_all,  # Pass show_all
+        cursor=cursor,
+        total_mode=total,
+        fields=list(selected_fields) if selected_fields else None,
+        expand=list(selected_expand) if selected_expand else None,
+        include_archived=include_archived
     )
+
+    if selected_fields or selected_expand:
+        if selected_expand:
+            items = await task_service.expand_tasks(tasks, list(selected_expand), session)
+        else:
+            items = [dict(row._mapping) for row in tasks]
+        # Rows only hold the selected columns; the matching slim model serializes them
+        body = slim_task_list_model(selected_fields or TASK_FIELDS, selected_expand or ())(
+            total=total_count,
+            total_is_estimate=total_is_estimate,
+            page=page,
+            limit=limit,
+            next_cursor=next_cursor,
+            tasks=items,
+        )
+        return json_response(body.model_dump_json(), if_none_match, etag)
+
     return {
-        "total": total,
+        "total": total_count,
+        "total_is_estimate": total_is_estimate,
         "page": page,
         "limit": limit,
+        "next_cursor": next_cursor,
+        "tasks": tasks,
+    }
+
+
+# SEARCH TASKS - Keyword search with the same filters and visibility as /all
+@task_router.get("/search")
+async def search_tasks(
+    q: str = Query(min_length=1),
+    page: int = 1,
+    limit: int = 10,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    assignee: Optional[str] = None,
+    show_all: bool = False,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role in ["user", "employee"]:
+        show_all = False
+
+    tasks = await task_service.search_tasks(
+        session=session,
+        q=q,
+        page=page,
+        limit=limit,
+        status=status,
+        priority=priority,
+        assignee=assignee,
+        current_user=current_user,
+        show_all=show_all
+    )
+    return {
+        "q": q,
+        "page": page,
+        "limit": limit,
+        "tasks": tasks,
+    }
+
+
+# EXPORT TASKS - Same visibility rules as /all, streamed from a server-side cursor
+@task_router.get("/export")
+async def export_tasks(
+    format: ExportFormatEnum = ExportFormatEnum.ndjson,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    assignee: Optional[str] = None,
+    show_all: bool = False,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role in ["user", "employee"]:
+        show_all = False
+
+    chunks = task_service.stream_tasks(
+        session=session,
+        status=status,
+        priority=priority,
+        assignee=assignee,
+        current_user=current_user,
+        show_all=show_all
+    )
+
+    async def encode():
+        header = True
+        async for tasks in chunks:
+            if format == ExportFormatEnum.csv:
+                yield encode_csv_chunk(tasks, header=header)
+                header = False
+            else:
+                yield encode_ndjson_chunk(tasks)
+
+    media_type = "text/csv" if format == ExportFormatEnum.csv else "application/x-ndjson"
+    return StreamingResponse(
+        encode(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format.value}"'}
+    )
+
+
+# TASK STATS - Counts by status, priority and assignee, plus overdue
+@task_router.get("/stats", dependencies=[Depends(manager_admin)])
+async def get_task_stats(session: AsyncSession = Depends(get_session)):
+    return await stats_service.get_stats(session)
+
+
+# RECONCILE TASK STATS - Admin only; recomputes the counters from the tasks table
+@task_router.post("/stats/reconcile", dependencies=[Depends(admin_only)])
+async def reconcile_task_stats(session: AsyncSession = Depends(get_session)):
+    return await stats_service.reconcile(session)
+
+
+# TASK CHANGES - Delta sync: what was written or deleted after ?since=<cursor>
+@task_router.get("/changes", response_model=TaskChangesResponse)
+async def get_task_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=1000),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    tasks, deleted, cursor, has_more = await task_service.get_changes(
+        session=session,
+        since=since,
+        limit=limit,
+        current_user=current_user
+    )
+    return {
+        "cursor": cursor,
+        "has_more": has_more,
         "tasks": tasks,
+        "deleted": deleted,
     }
 
 
+# TASK CHANGE STREAM (WebSocket) - Browsers cannot set headers, so the access token comes as ?token=
+@task_router.websocket("/stream")
+async def task_stream_ws(
+    websocket: WebSocket,
+    token: str,
+    session: AsyncSession = Depends(get_session),
+):
+    current_user = await get_user_from_token(token, session)
+    # Give the pooled connection back; the stream can stay open for hours
+    await session.close()
+    if current_user is None:
+        await websocket.close(code=http_status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscriber = task_event_broker.subscribe(current_user)
+
+    async def send_events():
+        while not subscriber.overflowed:
+            await websocket.send_text(await subscriber.queue.get())
+        await websocket.close(code=http_status.WS_1013_TRY_AGAIN_LATER)
+
+    async def wait_for_disconnect():
+        while True:
+            await websocket.receive_text()
+
+    tasks = [asyncio.create_task(send_events()), asyncio.create_task(wait_for_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        task_event_broker.unsubscribe(subscriber)
+
+
+# TASK CHANGE STREAM (Server-Sent Events)
+@task_router.get("/stream/sse")
+async def task_stream_sse(
+    # The same session get_current_user authenticated with (FastAPI shares it)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: User = Depends(get_current_user),
+):
+    # Give the pooled connection back; the stream can stay open for hours
+    await session.close()
+    subscriber = task_event_broker.subscribe(current_user)
+
+    async def events():
+        try:
+            while not subscriber.overflowed:
+                try:
+                    raw = await asyncio.wait_for(subscriber.queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {raw}\n\n"
+        finally:
+            task_event_broker.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # GET TASK BY ID - Any logged-in user can view a task
 @task_router.get(
     "/{task_id}",
@@ -83,16 +366,34 @@ async def get_all_tasks(
 )
 async def get_task_by_id(
     task_id: str,
-    session: AsyncSession = Depends(get_session),
+    expand: Optional[str] = Query(None, description="Comma-separated user summaries to embed: creator,assignee"),
+    if_none_match: Optional[str] = Header(None),
+    session: AsyncSession = Depends(get_read_session),
     _: User = Depends(get_current_user),
 ):
+    selected_expand = parse_expand(expand)
     try:
-        return await task_service.get_task_by_id(task_id, session)
+        if selected_expand:
+            # One query for the task, one for the users it references
+            task = await task_service.get_task_by_id(
+                str(task_service.parse_task_uid(task_id)), session
+            )
+            [item] = await task_service.expand_tasks([task], list(selected_expand), session)
+            body = slim_task_model(TASK_FIELDS, selected_expand).model_validate(item)
+            return json_response(body.model_dump_json(), if_none_match)
+
+        # Cached JSON is sent as-is, skipping response model serialization
+        etag, payload = await task_service.get_task_json(task_id, session)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(content=payload, media_type="application/json", headers={"ETag": etag})
     except TaskNotFound as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
 # UPDATE TASK - Manager & admin only
+# Send If-Match (the ETag from GET /{task_id}) or expected_version to reject
+# the update with 409 if someone else changed the task in the meantime.
 @task_router.post(
     "/update_task",
     response_model=TaskResponse,
@@ -101,13 +402,22 @@ async def get_task_by_id(
 async def update_task(
     task_uid: str,
     update_task_data: TaskUpdate,
+    response: Response,
+    expected_version: Optional[int] = None,
+    if_match: Optional[str] = Header(None),
     session: AsyncSession = Depends(get_session),
     _: User = Depends(get_current_user),
 ):
+    if if_match is not None:
+        expected_version = parse_task_etag(if_match)
     try:
-        return await task_service.update_task_fields(task_uid, update_task_data, session)
+        task = await task_service.update_task_fields(
+            task_uid, update_task_data, session, expected_version=expected_version
+        )
     except TaskNotFound as e:
         raise HTTPException(status_code=404, detail=str(e))
+    response.headers["ETag"] = task_etag(task.version)
+    return task
 
 
 # DELETE TASK - Admin only
@@ -127,4 +437,47 @@ async def delete_task(
             "task": task,
         }
     except TaskNotFound as e:
-        raise HTTPException(status_code=404, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+# BULK CREATE TASKS - Manager & admin only
+@task_router.post(
+    "/bulk/create_tasks",
+    response_model=TaskBulkResponse,
+    dependencies=[Depends(manager_admin)]
+)
+async def bulk_create_tasks(
+    bulk_data: TaskBulkCreate,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    results = await task_service.bulk_create_tasks(bulk_data.tasks, session, current_user)
+    return bulk_response(results)
+
+
+# BULK UPDATE TASKS - Manager & admin only
+@task_router.post(
+    "/bulk/update_tasks",
+    response_model=TaskBulkResponse,
+    dependencies=[Depends(manager_admin)]
+)
+async def bulk_update_tasks(
+    bulk_data: TaskBulkUpdate,
+    session: AsyncSession = Depends(get_session),
+):
+    results = await task_service.bulk_update_tasks(bulk_data.tasks, session)
+    return bulk_response(results)
+
+
+# BULK DELETE TASKS - Admin only
+@task_router.delete(
+    "/bulk/delete_tasks",
+    response_model=TaskBulkResponse,
+    dependencies=[Depends(admin_only)]
+)
+async def bulk_delete_tasks(
+    bulk_data: TaskBulkDelete,
+    session: AsyncSession = Depends(get_session),
+):
+    results = await task_service.bulk_delete_tasks(bulk_data.uids, session)
+    return bulk_response(results)
@@ -1,8 +1,21 @@
 
 from datetime import date, datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, create_model
+from functools import lru_cache
 import uuid
 from typing import Optional
+from enum import Enum
+
+from src.users.schemas import EmployeeSummaryModel
+
+class TotalModeEnum(str, Enum):
+    exact = "exact"          # single COUNT(*) over the filtered query
+    estimate = "estimate"    # planner row estimate, exact COUNT(*) for small sets
+    none = "none"            # skip counting entirely
+
+class ExportFormatEnum(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
 
 class TaskCreate(BaseModel):
     title: str
@@ -23,17 +36,52 @@ class TaskResponse(BaseModel):
     assigned_to: Optional[uuid.UUID]
     created_at: datetime
     updated_at: datetime
+    version: int
 
     class Config:
         orm_mode = True
 
 class TaskListResponse(BaseModel):
-    total: int
+    total: Optional[int]
+    total_is_estimate: bool = False
     page : int
     limit: int
+    next_cursor: Optional[str]
     tasks: list[TaskResponse]
 #class TaskListResponse(BaseModel):
 
+TASK_FIELDS = tuple(TaskResponse.model_fields)
+
+# expand=<name> embeds a summary of the user referenced by this task column
+TASK_EXPANSIONS = {"creator": "created_by", "assignee": "assigned_to"}
+
+
+@lru_cache(maxsize=128)
+def slim_task_model(fields: tuple[str, ...], expand: tuple[str, ...] = ()) -> type[BaseModel]:
+    """TaskResponse with only the requested fields, plus the requested user summaries."""
+    return create_model(
+        "TaskSlimResponse",
+        **{name: (TaskResponse.model_fields[name].annotation, ...) for name in fields},
+        **{name: (Optional[EmployeeSummaryModel], None) for name in expand}
+    )
+
+
+@lru_cache(maxsize=128)
+def slim_task_list_model(fields: tuple[str, ...], expand: tuple[str, ...] = ()) -> type[BaseModel]:
+    """TaskListResponse whose tasks are slim_task_model(fields, expand)."""
+    return create_model(
+        "TaskSlimListResponse",
+        __base__=TaskListResponse,
+        tasks=(list[slim_task_model(fields, expand)], ...)
+    )
+
+
+
+class TaskChangesResponse(BaseModel):
+    cursor: int         # pass back as ?since= on the next sync
+    has_more: bool
+    tasks: list[TaskResponse]       # created or updated since the cursor
+    deleted: list[uuid.UUID]        # deleted, or reassigned away from you
 
 
 class TaskUpdate(BaseModel):
@@ -45,3 +93,35 @@ class TaskUpdate(BaseModel):
     assigned_to: Optional[uuid.UUID] = None
 
 
+# --------------------------------------------------
+# Bulk operations
+# --------------------------------------------------
+MAX_BULK_TASKS = 500
+
+class TaskBulkCreate(BaseModel):
+    tasks: list[TaskCreate] = Field(min_length=1, max_length=MAX_BULK_TASKS)
+
+
+class TaskBulkUpdateItem(TaskUpdate):
+    uid: uuid.UUID
+
+
+class TaskBulkUpdate(BaseModel):
+    tasks: list[TaskBulkUpdateItem] = Field(min_length=1, max_length=MAX_BULK_TASKS)
+
+
+class TaskBulkDelete(BaseModel):
+    uids: list[uuid.UUID] = Field(min_length=1, max_length=MAX_BULK_TASKS)
+
+
+class TaskBulkItemResult(BaseModel):
+    index: int
+    uid: Optional[uuid.UUID] = None
+    status: str     # created, updated, deleted, not_found, duplicate, assignee_not_found
+    task: Optional[TaskResponse] = None
+
+
+class TaskBulkResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[TaskBulkItemResult]
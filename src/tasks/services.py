@@ -1,19 +1,54 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select
+from sqlmodel import select, func, text
+from sqlalchemy import tuple_, insert, update, delete, case, cast, column, literal, null, String, DateTime, Boolean
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Row
 from datetime import datetime
 from typing import Optional
-
-from src.db.models import Task
-from .schemas import TaskCreate, TaskUpdate
-from src.errors import TaskNotFound
-
-from src.mail import mail, create_message
-from src.users.services import EmployeeManagementService
-
-auth_service = EmployeeManagementService()
+from collections import Counter
+import uuid
+import json
+
+from src.core.config import config_obj
+from src.db import fastpath
+from src.db.main import async_session_maker
+from src.db.replicas import is_replica_session
+from src.db.models import Task, TaskArchive, TaskTombstone, User, TASK_CHANGE_SEQ
+from .schemas import TaskCreate, TaskUpdate, TaskResponse, TotalModeEnum, TaskBulkUpdateItem, TASK_EXPANSIONS
+from .cache import task_cache, bump_task_set_versions
+from .stats import TaskStatsService, task_buckets
+from .events import task_event, publish_task_events
+from .archive import task_source
+from .notifications import assignment_digest
+from .utils import encode_cursor, decode_cursor, task_etag
+from src.errors import TaskNotFound, TaskVersionConflict
+
+stats_service = TaskStatsService()
+
+# Below this many estimated rows an exact COUNT(*) is cheap enough to run
+ESTIMATE_TOTAL_THRESHOLD = 10_000
+
+# Rows pulled per round trip from the export's server-side cursor
+EXPORT_CHUNK_SIZE = 1000
+
+# Every transaction that draws from task_change_seq holds this advisory lock
+# (shared) until it ends; delta sync takes it exclusively to find the highest
+# sequence number below which nothing is still in flight.
+CHANGE_FEED_LOCK_ID = 0x7461736B5F636867   # "task_chg"
+
+# Column types for the unnest() arrays that carry per-row bulk updates
+BULK_UPDATE_FIELDS = {
+    "title": String(),
+    "description": String(),
+    "status": String(),
+    "priority": String(),
+    "due_date": DateTime(),
+    "assigned_to": postgresql.UUID(),
+}
 
 
 class TaskService:
+    fast_path = config_obj.TASK_LOOKUP_FAST_PATH
 
     async def create_task(
         self,
@@ -29,17 +64,17 @@ class TaskService:
             created_by=current_user.uid
         )
 
+        await self.lock_change_feed(session)
         session.add(new_task)
+        await stats_service.apply_deltas(stats_service.added(new_task), session)
         await session.commit()
         await session.refresh(new_task)
+        await bump_task_set_versions(new_task.created_by, new_task.assigned_to)
+        await publish_task_events(task_event("created", new_task))
 
-        # Send email AFTER successful DB commit
+        # Notify AFTER successful DB commit
         if assigned_to:
-            await self.send_assignment_email(
-                task=new_task,
-                user_uid=assigned_to,
-                session=session
-            )
+            await assignment_digest.add((new_task, assigned_to))
 
         return new_task
 
@@ -47,15 +82,53 @@ class TaskService:
     # GET TASK BY ID (Single source of truth)
     # --------------------------------------------------
     async def get_task_by_id(self, task_id: str, session: AsyncSession):
-        statement = select(Task).where(Task.uid == task_id)
-        result = await session.exec(statement)
-        task = result.first()
+        """The task (or its archived copy); a read-only TaskRecord on the fast path."""
+        if self.fast_path:
+            task = await fastpath.task_by_uid(session, task_id)
+        else:
+            statement = select(Task).where(Task.uid == task_id)
+            result = await session.exec(statement)
+            task = result.first()
+
+            if not task:
+                # Archived tasks stay readable by id, but nothing can change them
+                task = await session.get(TaskArchive, task_id)
 
         if not task:
             raise TaskNotFound("Task not found")
 
         return task
 
+    # --------------------------------------------------
+    # GET TASK JSON (Read-through cache in front of get_task_by_id)
+    # --------------------------------------------------
+    @staticmethod
+    def parse_task_uid(task_uid) -> uuid.UUID:
+        try:
+            return uuid.UUID(str(task_uid))
+        except ValueError:
+            raise TaskNotFound("Task not found")
+
+    async def get_task_json(self, task_id: str, session: AsyncSession) -> tuple[str, str]:
+        """Returns (etag, TaskResponse JSON); a cache hit touches neither the DB nor the ORM."""
+        task_id = str(self.parse_task_uid(task_id))
+
+        cached = await task_cache.get(task_id)
+        if cached is not None:
+            return cached
+
+        if is_replica_session(session):
+            # The cache is shared, so fill it from the primary; a lagging
+            # replica could return the row from before the last invalidation
+            async with async_session_maker() as primary:
+                task = await self.get_task_by_id(task_id, primary)
+        else:
+            task = await self.get_task_by_id(task_id, session)
+        etag = task_etag(task.version)
+        payload = TaskResponse.model_validate(task, from_attributes=True).model_dump_json()
+        await task_cache.set(task_id, task.version, etag, payload)
+        return etag, payload
+
     # --------------------------------------------------
     # UPDATE TASK
     # --------------------------------------------------
@@ -63,34 +136,144 @@ class TaskService:
         self,
         task_uid: str,
         update_task_data: TaskUpdate,
-        session: AsyncSession
+        session: AsyncSession,
+        expected_version: Optional[int] = None
     ):
-        task = await self.get_task_by_id(task_uid, session)
-
-        old_assignee = task.assigned_to
+        task_uid = self.parse_task_uid(task_uid)
         task_data = update_task_data.model_dump(exclude_unset=True)
+        if "due_date" in task_data:
+            # A new due date earns a new reminder
+            task_data["reminder_sent_at"] = None
+
+        statement = self.update_task_statement(task_uid, task_data, expected_version)
+        await self.lock_change_feed(session)
+        result = await session.execute(statement)
+        row = result.first()
+
+        if row is None:
+            # Only the failure path pays for a second query, to tell the errors apart
+            if expected_version is not None and await session.get(Task, task_uid) is not None:
+                raise TaskVersionConflict("Task version does not match")
+            raise TaskNotFound("Task not found")
 
-        for key, value in task_data.items():
-            setattr(task, key, value)
-
-        task.updated_at = datetime.utcnow()
+        task, old_status, old_priority, old_assignee = row
+        deltas = stats_service.added(task)
+        deltas.subtract(task_buckets(old_status, old_priority, old_assignee))
+        await self.add_revocations([(task, old_assignee)], session)
+        await stats_service.apply_deltas(deltas, session)
         await session.commit()
+        await task_cache.invalidate(task)
+        await bump_task_set_versions(task.created_by, old_assignee, task.assigned_to)
+        await publish_task_events(self.update_event(task, old_assignee))
 
-        new_assigned_to = task_data.get("assigned_to")
-        if "assigned_to" in task_data and new_assigned_to != old_assignee:
-            if new_assigned_to is not None:
-                await self.send_assignment_email(
-                    task=task,
-                    user_uid=new_assigned_to,
-                    session=session
-                )
+        if task.assigned_to is not None and task.assigned_to != old_assignee:
+            await assignment_digest.add((task, task.assigned_to))
 
-        await session.refresh(task)
         return task
 
+    @staticmethod
+    def locked_old_values(*uids):
+        """The current status, priority and assignee of tasks, locked for update.
+
+        Joined into an UPDATE to return what it overwrote. FOR UPDATE waits for
+        a concurrent writer and then reads the row it committed, which is the
+        row the UPDATE rechecks and overwrites. A plain self join would keep
+        the values from before that write.
+        """
+        return (
+            select(Task.uid, Task.status, Task.priority, Task.assigned_to)
+            .where(Task.uid.in_(uids))
+            .order_by(Task.uid)     # one lock order, so concurrent bulk updates cannot deadlock
+            .with_for_update()
+            .subquery("old")
+        )
+
+    def update_task_statement(self, task_uid: uuid.UUID, task_data: dict, expected_version: Optional[int] = None):
+        # One UPDATE ... RETURNING: the version check, the write, the new row
+        # and the values it replaced in a single round trip
+        old = self.locked_old_values(task_uid)
+        statement = update(Task).where(Task.uid == task_uid, old.c.uid == Task.uid)
+        if expected_version is not None:
+            statement = statement.where(Task.version == expected_version)
+        return (
+            statement.values(
+                **task_data,
+                updated_at=datetime.utcnow(),
+                version=Task.version + 1,
+                change_seq=TASK_CHANGE_SEQ.next_value()
+            )
+            .returning(Task, old.c.status, old.c.priority, old.c.assigned_to)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def update_event(task: Task, old_assignee) -> dict:
+        if task.assigned_to != old_assignee:
+            return task_event("reassigned", task, previous_assigned_to=old_assignee)
+        return task_event("updated", task)
+
     # --------------------------------------------------
-    # GET ALL TASKS (Pagination + Filters + User-specific)
+    # GET ALL TASKS (Keyset pagination + Filters + User-specific)
     # --------------------------------------------------
+    def visible_tasks_statement(
+        self,
+        statement,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        assignee: Optional[str] = None,
+        current_user=None,
+        show_all: bool = False,
+        source=Task
+    ):
+        # Regular users can only see tasks assigned to them or created by them
+        if current_user and not show_all and current_user.role in ["user", "employee"]:
+            statement = statement.where(
+                (source.assigned_to == current_user.uid) |
+                (source.created_by == current_user.uid)
+            )
+
+        if status:
+            statement = statement.where(source.status == status)
+
+        if priority:
+            statement = statement.where(source.priority == priority)
+
+        if assignee:
+            statement = statement.where(source.assigned_to == assignee)
+
+        return statement
+
+    async def count_tasks(
+        self,
+        statement,
+        session: AsyncSession,
+        total_mode: TotalModeEnum = TotalModeEnum.exact
+    ):
+        """Returns (total, is_estimate) for a filtered task statement."""
+        if total_mode == TotalModeEnum.none:
+            return None, False
+
+        if total_mode == TotalModeEnum.estimate:
+            compiled = statement.compile(
+                dialect=postgresql.dialect(),
+                compile_kwargs={"literal_binds": True}
+            )
+            # Run as driver SQL: text() would read a ":name" inside a filter value as a bind
+            connection = await session.connection()
+            result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+            plan = result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]["Plan"]["Plan Rows"])
+            if estimate >= ESTIMATE_TOTAL_THRESHOLD:
+                return estimate, True
+
+        count_statement = select(func.count()).select_from(
+            statement.order_by(None).subquery()
+        )
+        result = await session.exec(count_statement)
+        return result.one(), False
+
     async def get_all_tasks(
         self,
         session: AsyncSession,
@@ -99,78 +282,533 @@ class TaskService:
         status: Optional[str] = None,
         priority: Optional[str] = None,
         assignee: Optional[str] = None,
-        current_user=None,  # Add current_user parameter
-        show_all: bool = False  # Add show_all parameter for managers/admins
+        current_user=None,
+        show_all: bool = False,
+        cursor: Optional[str] = None,
+        total_mode: TotalModeEnum = TotalModeEnum.exact,
+        fields: Optional[list[str]] = None,
+        expand: Optional[list[str]] = None,
+        include_archived: bool = False
     ):
-        statement = select(Task)
+        """With fields, only those columns (plus the cursor keys) are selected and rows are returned.
 
-        # If current_user is provided and not showing all tasks,
-        # regular users can only see tasks assigned to them or created by them
-        if current_user and not show_all and current_user.role in ["user", "employee"]:
+        Archived tasks are only read with include_archived; the default list
+        stays on the hot tasks table.
+        """
+        source = task_source(include_archived)
+        if fields:
+            expand_keys = [TASK_EXPANSIONS[name] for name in expand or []]
+            columns = dict.fromkeys([*fields, *expand_keys, "uid", "created_at"])
+            base = select(*(getattr(source, name) for name in columns))
+        else:
+            base = select(source)
+
+        statement = self.visible_tasks_statement(
+            base,
+            status=status,
+            priority=priority,
+            assignee=assignee,
+            current_user=current_user,
+            show_all=show_all,
+            source=source
+        )
+
+        total, total_is_estimate = await self.count_tasks(statement, session, total_mode)
+
+        # Newest first; uid breaks ties between tasks created in the same instant
+        statement = statement.order_by(source.created_at.desc(), source.uid.desc())
+
+        if cursor:
+            created_at, uid = decode_cursor(cursor)
             statement = statement.where(
-                (Task.assigned_to == current_user.uid) | 
-                (Task.created_by == current_user.uid)
+                tuple_(source.created_at, source.uid) < tuple_(created_at, uid)
             )
+        elif page > 1:
+            # Legacy offset paging, kept for clients that have not moved to cursors
+            statement = statement.offset((page - 1) * limit)
 
-        if status:
-            statement = statement.where(Task.status == status)
+        # Fetch one extra row to find out whether another page exists
+        result = await session.exec(statement.limit(limit + 1))
+        tasks = result.all()
 
-        if priority:
-            statement = statement.where(Task.priority == priority)
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            last = tasks[-1]
+            next_cursor = encode_cursor(last.created_at, last.uid)
 
-        if assignee:
-            statement = statement.where(Task.assigned_to == assignee)
+        return tasks, total, total_is_estimate, next_cursor
 
-        result = await session.exec(statement)
-        all_tasks = result.all()
-        total = len(all_tasks)
+    # --------------------------------------------------
+    # EXPAND TASKS (creator/assignee summaries, one query per page)
+    # --------------------------------------------------
+    async def expand_tasks(self, tasks: list, expand: list[str], session: AsyncSession) -> list[dict]:
+        """Task dicts with the expanded user summaries, looked up with a single IN query."""
+        keys = [TASK_EXPANSIONS[name] for name in expand]
+        user_uids = {getattr(task, key) for task in tasks for key in keys} - {None}
+
+        users = {}
+        if user_uids:
+            result = await session.exec(
+                select(User.uid, User.username, User.email).where(User.uid.in_(user_uids))
+            )
+            users = {row.uid: dict(row._mapping) for row in result.all()}
 
-        offset = (page - 1) * limit
-        statement = statement.offset(offset).limit(limit)
+        expanded = []
+        for task in tasks:
+            item = dict(task._mapping) if isinstance(task, Row) else task.model_dump()
+            for name, key in zip(expand, keys):
+                item[name] = users.get(getattr(task, key))
+            expanded.append(item)
+        return expanded
+
+    # --------------------------------------------------
+    # SEARCH TASKS (Full-text over title + description)
+    # --------------------------------------------------
+    async def search_tasks(
+        self,
+        session: AsyncSession,
+        q: str,
+        page: int = 1,
+        limit: int = 10,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        assignee: Optional[str] = None,
+        current_user=None,
+        show_all: bool = False
+    ):
+        search_vector = Task.__table__.c.search_vector
+        query = func.websearch_to_tsquery("english", q)
+        rank = func.ts_rank(search_vector, query)
+
+        statement = self.visible_tasks_statement(
+            select(Task).where(search_vector.op("@@")(query)),
+            status=status,
+            priority=priority,
+            assignee=assignee,
+            current_user=current_user,
+            show_all=show_all
+        )
+        statement = (
+            statement.order_by(rank.desc(), Task.uid)
+            .offset((page - 1) * limit)
+            .limit(limit)
+        )
 
         result = await session.exec(statement)
-        tasks = result.all()
+        return result.all()
 
-        return tasks, total
+    # --------------------------------------------------
+    # STREAM TASKS (server-side cursor for exports)
+    # --------------------------------------------------
+    async def stream_tasks(
+        self,
+        session: AsyncSession,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        assignee: Optional[str] = None,
+        current_user=None,
+        show_all: bool = False
+    ):
+        """Yields lists of tasks, one per cursor fetch, without buffering the result."""
+        statement = self.visible_tasks_statement(
+            select(Task),
+            status=status,
+            priority=priority,
+            assignee=assignee,
+            current_user=current_user,
+            show_all=show_all
+        ).order_by(Task.created_at, Task.uid)
+
+        result = await session.stream_scalars(
+            statement.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        async for chunk in result.partitions():
+            yield chunk
+            # Drop the chunk from the identity map so memory stays flat
+            for task in chunk:
+                session.expunge(task)
 
     # --------------------------------------------------
     # DELETE TASK
     # --------------------------------------------------
     async def delete_task(self, task_uid: str, session: AsyncSession):
-        task = await self.get_task_by_id(task_uid, session)
-        await session.delete(task)
+        statement = (
+            delete(Task)
+            .where(Task.uid == self.parse_task_uid(task_uid))
+            .returning(Task)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.scalars(statement)
+        task = result.first()
+        if task is None:
+            raise TaskNotFound("Task not found")
+
+        await self.add_tombstones([task], session)
+        await stats_service.apply_deltas(stats_service.removed(task), session)
         await session.commit()
+        await task_cache.invalidate(task, deleted=True)
+        await bump_task_set_versions(task.created_by, task.assigned_to)
+        await publish_task_events(task_event("deleted", task))
         return task
 
+    async def add_tombstones(self, tasks: list[Task], session: AsyncSession) -> None:
+        """Records deleted tasks for delta sync; the caller commits."""
+        await self.insert_tombstones([
+            {"uid": task.uid, "created_by": task.created_by, "assigned_to": task.assigned_to}
+            for task in tasks
+        ], session)
+
+    async def add_revocations(self, reassigned: list[tuple], session: AsyncSession) -> None:
+        """Records (task, old_assignee) reassignments that hide the task from
+        the previous assignee, so their next sync drops it; the caller commits."""
+        await self.insert_tombstones([
+            {"uid": task.uid, "created_by": task.created_by, "assigned_to": old_assignee, "revoked": True}
+            for task, old_assignee in reassigned
+            if old_assignee is not None and old_assignee not in (task.assigned_to, task.created_by)
+        ], session)
+
+    async def insert_tombstones(self, rows: list[dict], session: AsyncSession) -> None:
+        if not rows:
+            return
+        await self.lock_change_feed(session)
+        await session.execute(insert(TaskTombstone).values(rows))
+
     # --------------------------------------------------
-    # SEND ASSIGNMENT EMAIL
+    # CHANGES (Delta sync by change_seq)
     # --------------------------------------------------
-    async def send_assignment_email(
+    @staticmethod
+    async def lock_change_feed(session: AsyncSession) -> None:
+        """Call before drawing a change_seq; held until the transaction ends."""
+        await session.execute(select(func.pg_advisory_xact_lock_shared(CHANGE_FEED_LOCK_ID)))
+
+    @staticmethod
+    async def change_horizon(session: AsyncSession) -> int:
+        """The highest change_seq no open transaction can still commit below.
+
+        Sequence numbers are drawn before commit, so a writer can commit seq 12
+        while seq 11 is still in flight; a cursor past 12 would skip 11 for good.
+        The exclusive lock waits out the writers holding seqs (they hold it
+        shared) and makes new ones queue for the moment it takes to read
+        last_value. The lock is session level so it is released right away,
+        not at the end of the caller's transaction.
+        """
+        await session.execute(select(func.pg_advisory_lock(CHANGE_FEED_LOCK_ID)))
+        try:
+            # last_value is the next value, not a drawn one, until is_called
+            return await session.scalar(text(
+                "SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM task_change_seq"
+            ))
+        finally:
+            await session.execute(select(func.pg_advisory_unlock(CHANGE_FEED_LOCK_ID)))
+
+    @staticmethod
+    def visible_tombstones_statement(statement, current_user=None):
+        # Revocations are only for the previous assignee; everyone else who could
+        # see the task still can
+        if current_user and current_user.role in ["user", "employee"]:
+            return statement.where(
+                (TaskTombstone.assigned_to == current_user.uid) |
+                ((TaskTombstone.created_by == current_user.uid) & ~TaskTombstone.revoked)
+            )
+        return statement.where(~TaskTombstone.revoked)
+
+    async def get_changes(
         self,
-        task: Task,
-        user_uid: str,
-        session: AsyncSession
+        session: AsyncSession,
+        since: int = 0,
+        limit: int = 500,
+        current_user=None
     ):
-        user = await auth_service.get_employee_by_id(user_uid, session)
-
-        if not user:
-            return
+        """Tasks written and tasks deleted (or taken away) after `since`, oldest change first.
 
-        html = f"""
-        <h2>New Task Assigned</h2>
-        <p>Hello {user.username},</p>
-        <p>You have been assigned a new task:</p>
-        <ul>
-            <li><b>Title:</b> {task.title}</li>
-            <li><b>Due Date:</b> {task.due_date}</li>
-            <li><b>Status:</b> {task.status}</li>
-        </ul>
+        Both come from ix_tasks_change_seq / task_tombstones primary key range
+        scans, so the cost follows the number of changes, not the table. Only
+        changes up to change_horizon() are returned, so the cursor never moves
+        past a write that has yet to commit.
+        Returns (tasks, deleted_uids, cursor, has_more).
         """
+        horizon = await self.change_horizon(session)
+
+        statement = self.visible_tasks_statement(
+            select(Task).where(Task.change_seq > since, Task.change_seq <= horizon),
+            current_user=current_user
+        ).order_by(Task.change_seq).limit(limit + 1)
+        tasks = (await session.exec(statement)).all()
+
+        tombstones_statement = self.visible_tombstones_statement(
+            select(TaskTombstone).where(TaskTombstone.change_seq > since, TaskTombstone.change_seq <= horizon),
+            current_user=current_user
+        ).order_by(TaskTombstone.change_seq).limit(limit + 1)
+        tombstones = (await session.exec(tombstones_statement)).all()
+
+        # Both lists are sorted by the same sequence, so the first `limit` of
+        # the merge leave no gap below the returned cursor.
+        changes = sorted([*tasks, *tombstones], key=lambda change: change.change_seq)
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        # With nothing left below the horizon the cursor can skip to it, past
+        # the changes this user cannot see
+        cursor = changes[-1].change_seq if has_more else max(horizon, since)
+
+        tasks = [change for change in changes if isinstance(change, Task)]
+        # A task that came back to the user after a revocation is sent as a task
+        returned = {task.uid for task in tasks}
+        deleted = list(dict.fromkeys(
+            change.uid for change in changes
+            if isinstance(change, TaskTombstone) and change.uid not in returned
+        ))
+        return tasks, deleted, cursor, has_more
+
+    # --------------------------------------------------
+    # BULK OPERATIONS (one statement per batch)
+    # --------------------------------------------------
+    async def existing_user_uids(self, uids: set, session: AsyncSession) -> set:
+        if not uids:
+            return set()
+        result = await session.exec(select(User.uid).where(User.uid.in_(uids)))
+        return set(result.all())
+
+    async def bulk_create_tasks(
+        self,
+        tasks_data: list[TaskCreate],
+        session: AsyncSession,
+        current_user
+    ):
+        assignees = {t.assigned_to for t in tasks_data if t.assigned_to}
+        known_users = await self.existing_user_uids(assignees, session)
+
+        now = datetime.utcnow()
+        results = []
+        rows = []
+        for index, task_data in enumerate(tasks_data):
+            if task_data.assigned_to and task_data.assigned_to not in known_users:
+                results.append({"index": index, "status": "assignee_not_found"})
+                continue
+            row = {
+                **task_data.model_dump(),
+                "uid": uuid.uuid4(),
+                "status": "pending",
+                "created_by": current_user.uid,
+                "created_at": now,
+                "updated_at": now,
+                "version": 1,
+            }
+            rows.append(row)
+            results.append({"index": index, "uid": row["uid"], "status": "created"})
+
+        created = {}
+        if rows:
+            await self.lock_change_feed(session)
+            statement = insert(Task).values(rows).returning(Task)
+            result = await session.scalars(statement)
+            created = {task.uid: task for task in result.all()}
+            await stats_service.apply_deltas(stats_service.added(*created.values()), session)
+            await session.commit()
+            await bump_task_set_versions(
+                current_user.uid, *(task.assigned_to for task in created.values())
+            )
+            await publish_task_events(*(task_event("created", task) for task in created.values()))
+
+        for item in results:
+            item["task"] = created.get(item.get("uid"))
+
+        assignments = [(task, task.assigned_to) for task in created.values() if task.assigned_to]
+        await assignment_digest.add(*assignments)
+        return results
+
+    def bulk_update_statement(self, changes_by_uid: dict, fields: list[str]):
+        """One UPDATE for every task, each row's changes unnested from arrays."""
+        uids = list(changes_by_uid)
+        arrays = [cast(literal(uids, postgresql.ARRAY(postgresql.UUID())), postgresql.ARRAY(postgresql.UUID()))]
+        columns = [column("uid")]
+        for field in fields:
+            type_ = BULK_UPDATE_FIELDS[field]
+            values = [changes_by_uid[uid].get(field) for uid in uids]
+            flags = [field in changes_by_uid[uid] for uid in uids]
+            arrays.append(cast(literal(values, postgresql.ARRAY(type_)), postgresql.ARRAY(type_)))
+            arrays.append(cast(literal(flags, postgresql.ARRAY(Boolean())), postgresql.ARRAY(Boolean())))
+            columns += [column(field), column(f"set_{field}")]
+
+        changes = func.unnest(*arrays).table_valued(*columns, name="changes").render_derived()
+
+        # The values each row had, from the row the UPDATE overwrites
+        old = self.locked_old_values(*uids)
+        set_values = {
+            field: case(
+                (changes.c[f"set_{field}"], changes.c[field]),
+                else_=getattr(Task, field)
+            )
+            for field in fields
+        }
+        if "due_date" in fields:
+            set_values["reminder_sent_at"] = case(
+                (changes.c.set_due_date, null()),
+                else_=Task.reminder_sent_at
+            )
+        return (
+            update(Task)
+            .where(Task.uid == changes.c.uid, old.c.uid == Task.uid)
+            .values(
+                **set_values,
+                updated_at=datetime.utcnow(),
+                version=Task.version + 1,
+                change_seq=TASK_CHANGE_SEQ.next_value()
+            )
+            .returning(Task, old.c.status, old.c.priority, old.c.assigned_to)
+            .execution_options(synchronize_session=False)
+        )
 
-        message = create_message(
-            recipients=[user.email],
-            subject="You have been assigned a task",
-            body=html
+    async def bulk_update_tasks(
+        self,
+        items: list[TaskBulkUpdateItem],
+        session: AsyncSession
+    ):
+        changes_by_uid = {}
+        results = []
+        for index, item in enumerate(items):
+            if item.uid in changes_by_uid:
+                results.append({"index": index, "uid": item.uid, "status": "duplicate"})
+                continue
+            changes_by_uid[item.uid] = item.model_dump(exclude_unset=True, exclude={"uid"})
+            results.append({"index": index, "uid": item.uid, "status": None})
+
+        assignees = {c["assigned_to"] for c in changes_by_uid.values() if c.get("assigned_to")}
+        known_users = await self.existing_user_uids(assignees, session)
+        for uid, changes in list(changes_by_uid.items()):
+            if changes.get("assigned_to") and changes["assigned_to"] not in known_users:
+                del changes_by_uid[uid]
+
+        fields = [f for f in BULK_UPDATE_FIELDS if any(f in c for c in changes_by_uid.values())]
+        updated = {}
+        if changes_by_uid:
+            statement = self.bulk_update_statement(changes_by_uid, fields)
+            await self.lock_change_feed(session)
+            result = await session.execute(statement)
+            deltas = Counter()
+            for task, old_status, old_priority, old_assignee in result.all():
+                updated[task.uid] = (task, old_assignee)
+                deltas.subtract(task_buckets(old_status, old_priority, old_assignee))
+                deltas.update(stats_service.added(task))
+            await self.add_revocations(list(updated.values()), session)
+            await stats_service.apply_deltas(deltas, session)
+            await session.commit()
+            await task_cache.invalidate(*(task for task, old_assignee in updated.values()))
+            await bump_task_set_versions(*{
+                uid
+                for task, old_assignee in updated.values()
+                for uid in (task.created_by, task.assigned_to, old_assignee)
+            })
+            await publish_task_events(*(
+                self.update_event(task, old_assignee) for task, old_assignee in updated.values()
+            ))
+
+        assignments = []
+        for item in results:
+            if item["status"] is not None:
+                continue
+            if item["uid"] not in changes_by_uid:
+                item["status"] = "assignee_not_found"
+            elif item["uid"] not in updated:
+                item["status"] = "not_found"
+            else:
+                task, old_assignee = updated[item["uid"]]
+                item["status"] = "updated"
+                item["task"] = task
+                if task.assigned_to and task.assigned_to != old_assignee:
+                    assignments.append((task, task.assigned_to))
+
+        await assignment_digest.add(*assignments)
+        return results
+
+    async def bulk_delete_tasks(self, uids: list[uuid.UUID], session: AsyncSession):
+        statement = (
+            delete(Task)
+            .where(Task.uid.in_(set(uids)))
+            .returning(Task)
+            .execution_options(synchronize_session=False)
         )
+        result = await session.scalars(statement)
+        deleted = {task.uid: task for task in result.all()}
+        await self.add_tombstones(list(deleted.values()), session)
+        await stats_service.apply_deltas(stats_service.removed(*deleted.values()), session)
+        await session.commit()
+        await task_cache.invalidate(*deleted.values(), deleted=True)
+        await bump_task_set_versions(*{
+            uid for task in deleted.values() for uid in (task.created_by, task.assigned_to)
+        })
+        await publish_task_events(*(task_event("deleted", task) for task in deleted.values()))
+
+        results = []
+        seen = set()
+        for index, uid in enumerate(uids):
+            if uid in seen:
+                results.append({"index": index, "uid": uid, "status": "duplicate"})
+                continue
+            seen.add(uid)
+            task = deleted.get(uid)
+            results.append({
+                "index": index,
+                "uid": uid,
+                "status": "deleted" if task else "not_found",
+                "task": task,
+            })
+        return results
 
-        await mail.send_message(message)
\ No newline at end of file
+    # --------------------------------------------------
+    # USER REMOVAL (tasks go through the same bookkeeping as any task write)
+    # --------------------------------------------------
+    async def delete_user(self, user: User, new_creator: User, session: AsyncSession) -> None:
+        """Deletes the user in one transaction: the tasks assigned to them are
+        unassigned and the tasks they created are handed to `new_creator`, so
+        nobody else loses a task with them."""
+        await self.lock_change_feed(session)
+        result = await session.scalars(
+            update(Task)
+            .where(Task.assigned_to == user.uid)
+            .values(
+                assigned_to=None,
+                updated_at=datetime.utcnow(),
+                version=Task.version + 1,
+                change_seq=TASK_CHANGE_SEQ.next_value()
+            )
+            .returning(Task)
+            .execution_options(synchronize_session=False)
+        )
+        unassigned = result.all()
+        result = await session.scalars(
+            update(Task)
+            .where(Task.created_by == user.uid)
+            .values(
+                created_by=new_creator.uid,
+                updated_at=datetime.utcnow(),
+                version=Task.version + 1,
+                change_seq=TASK_CHANGE_SEQ.next_value()
+            )
+            .returning(Task)
+            .execution_options(synchronize_session=False)
+        )
+        handed_over = result.all()
+
+        # The creator is not part of any counter bucket, so only unassigning moves them
+        deltas = stats_service.added(*unassigned)
+        for task in unassigned:
+            deltas.subtract(task_buckets(task.status, task.priority, user.uid))
+        await stats_service.apply_deltas(deltas, session)
+        await session.delete(user)
+        await session.commit()
+
+        # A task both created by and assigned to the user was updated twice; the last write wins
+        changed = {task.uid: task for task in (*unassigned, *handed_over)}
+        unassigned_uids = {task.uid for task in unassigned}
+        await task_cache.invalidate(*changed.values())
+        await bump_task_set_versions(
+            user.uid,
+            new_creator.uid,
+            *{task.assigned_to for task in handed_over},
+            *{task.created_by for task in unassigned}
+        )
+        await publish_task_events(
+            *(task_event("reassigned", changed[task.uid], previous_assigned_to=user.uid) for task in unassigned),
+            *(task_event("updated", task) for task in handed_over if task.uid not in unassigned_uids)
+        )
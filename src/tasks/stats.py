@@ -0,0 +1,127 @@
+from collections import Counter
+from datetime import datetime
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel import select, func, text
+from sqlalchemy import delete, insert, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.db.models import Task, TaskArchive, TaskCounter
+
+UNASSIGNED_BUCKET = "unassigned"
+
+
+def task_buckets(status: str, priority: str, assigned_to) -> list[tuple[str, str]]:
+    return [
+        ("status", status),
+        ("priority", priority),
+        ("assignee", str(assigned_to) if assigned_to else UNASSIGNED_BUCKET),
+    ]
+
+
+class TaskStatsService:
+    """Status/priority/assignee counters maintained inside each task write's transaction."""
+
+    # --------------------------------------------------
+    # DELTAS (called by TaskService before it commits)
+    # --------------------------------------------------
+    @staticmethod
+    def added(*tasks) -> Counter:
+        deltas = Counter()
+        for task in tasks:
+            deltas.update(task_buckets(task.status, task.priority, task.assigned_to))
+        return deltas
+
+    @staticmethod
+    def removed(*tasks) -> Counter:
+        deltas = Counter()
+        for task in tasks:
+            deltas.subtract(task_buckets(task.status, task.priority, task.assigned_to))
+        return deltas
+
+    async def apply_deltas(self, deltas: Counter, session: AsyncSession) -> None:
+        """Upserts all non-zero deltas in one statement; the caller commits."""
+        rows = [
+            {"dimension": dimension, "bucket": bucket, "count": delta}
+            # Sorted so concurrent writers lock counter rows in the same order
+            for (dimension, bucket), delta in sorted(deltas.items())
+            if delta
+        ]
+        if not rows:
+            return
+
+        statement = pg_insert(TaskCounter).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[TaskCounter.dimension, TaskCounter.bucket],
+            set_={"count": TaskCounter.count + statement.excluded.count}
+        )
+        await session.execute(statement)
+
+    # --------------------------------------------------
+    # READ (O(buckets))
+    # --------------------------------------------------
+    async def get_stats(self, session: AsyncSession) -> dict:
+        result = await session.exec(
+            select(TaskCounter).where(TaskCounter.count != 0)
+        )
+        stats = {"status": {}, "priority": {}, "assignee": {}}
+        for counter in result.all():
+            stats.setdefault(counter.dimension, {})[counter.bucket] = counter.count
+
+        # Overdue depends on the clock, so it is counted from the partial
+        # index on open tasks' due_date instead of being kept as a counter.
+        overdue = await session.exec(
+            select(func.count()).select_from(Task).where(
+                Task.status != "completed",
+                Task.due_date < datetime.now()
+            )
+        )
+
+        return {
+            "total": sum(stats["status"].values()),
+            "by_status": stats["status"],
+            "by_priority": stats["priority"],
+            "by_assignee": stats["assignee"],
+            "overdue": overdue.one(),
+        }
+
+    # --------------------------------------------------
+    # RECONCILE (recompute from a single GROUP BY)
+    # --------------------------------------------------
+    async def reconcile(self, session: AsyncSession) -> dict:
+        # Writers upsert counters in their own transaction, so holding this lock
+        # while recounting means no delta is lost or applied twice.
+        await session.exec(text("LOCK TABLE task_counters IN EXCLUSIVE MODE"))
+
+        # Counters cover archived tasks too; the archiver moves rows without touching them
+        tasks = union_all(
+            select(Task.status, Task.priority, Task.assigned_to),
+            select(TaskArchive.status, TaskArchive.priority, TaskArchive.assigned_to),
+        ).subquery("all_tasks")
+        grouping = func.grouping(tasks.c.status, tasks.c.priority, tasks.c.assigned_to)
+        statement = select(
+            tasks.c.status, tasks.c.priority, tasks.c.assigned_to, grouping, func.count()
+        ).group_by(
+            func.grouping_sets(
+                tuple_(tasks.c.status), tuple_(tasks.c.priority), tuple_(tasks.c.assigned_to)
+            )
+        )
+        result = await session.exec(statement)
+
+        # GROUPING() sets a bit for every column the row is NOT grouped by
+        dimensions = {0b011: "status", 0b101: "priority", 0b110: "assignee"}
+        rows = []
+        for status, priority, assigned_to, group, count in result.all():
+            dimension = dimensions[group]
+            bucket = {
+                "status": status,
+                "priority": priority,
+                "assignee": str(assigned_to) if assigned_to else UNASSIGNED_BUCKET,
+            }[dimension]
+            rows.append({"dimension": dimension, "bucket": bucket, "count": count})
+
+        await session.execute(delete(TaskCounter))
+        if rows:
+            await session.execute(insert(TaskCounter).values(rows))
+        await session.commit()
+        return await self.get_stats(session)
@@ -0,0 +1,88 @@
+import base64
+import csv
+import hashlib
+import io
+import json
+import uuid
+from datetime import date, datetime
+from typing import Optional
+
+from src.errors import InvalidCursor, InvalidIfMatch
+
+
+def encode_cursor(created_at: datetime, uid: uuid.UUID) -> str:
+    payload = json.dumps({"c": created_at.isoformat(), "u": str(uid)})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["c"]), uuid.UUID(payload["u"])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor("Cursor is malformed")
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def task_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def parse_task_etag(if_match: str) -> Optional[int]:
+    """Version named by an If-Match header; None for '*' (any version)."""
+    if if_match.strip() == "*":
+        return None
+    try:
+        return int(if_match.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        # A malformed precondition is the client's error, not a lost update
+        raise InvalidIfMatch("If-Match does not name a task version")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {c.strip().removeprefix("W/") for c in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+EXPORT_COLUMNS = [
+    "uid", "title", "description", "status", "priority", "due_date",
+    "created_by", "assigned_to", "created_at", "updated_at", "version",
+]
+
+
+def _export_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def serialize_task(task) -> dict:
+    """JSON-ready dict of a task row, without going through TaskResponse validation."""
+    return {c: _export_value(getattr(task, c)) for c in EXPORT_COLUMNS}
+
+
+def encode_ndjson_chunk(tasks: list) -> str:
+    return "".join(json.dumps(serialize_task(task)) + "\n" for task in tasks)
+
+
+def encode_csv_chunk(tasks: list, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(
+        [_export_value(getattr(task, c)) for c in EXPORT_COLUMNS] for task in tasks
+    )
+    return buffer.getvalue()
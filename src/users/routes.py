@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.db.main import get_session
-from src.auth.dependencies import RoleChecker
+from src.db.replicas import get_read_session
+from src.auth.dependencies import RoleChecker, get_current_user
+from src.db.models import User
 from .schemas import EmployeeResponseModel,RoleUpdateSchema
 from .services import EmployeeManagementService
 from typing import List
@@ -12,12 +14,12 @@ role_checker = RoleChecker(["admin"])
 
 
 @user_router.get("/users/", response_model=List[EmployeeResponseModel], dependencies=[Depends(role_checker)])
-async def get_users(session : AsyncSession = Depends(get_session)):
+async def get_users(session : AsyncSession = Depends(get_read_session)):
     employees = await emp_service.get_all_employees(session)
     return employees
 
 @user_router.get("/user/{uid}", response_model=EmployeeResponseModel, dependencies=[Depends(role_checker)])
-async def get_user_by_uid(uid:str, session:AsyncSession = Depends(get_session)):
+async def get_user_by_uid(uid:str, session:AsyncSession = Depends(get_read_session)):
     employee = await emp_service.get_employee_by_id(uid, session)
     return employee
 
@@ -28,7 +30,7 @@ async def update_user_role(uid:str,update_employee_role:RoleUpdateSchema, sessio
 
 
 @user_router.delete("/user/{uid}",response_model=EmployeeResponseModel, dependencies=[Depends(role_checker)])
-async def delete(uid:str, session: AsyncSession = Depends(get_session)):
-    employee = await emp_service.delete_user(uid, session)
+async def delete(uid:str, current_user: User = Depends(get_current_user), session: AsyncSession = Depends(get_session)):
+    employee = await emp_service.delete_user(uid, current_user, session)
     return employee
 
@@ -19,6 +19,12 @@ class EmployeeResponseModel(BaseModel):
     updated_at : datetime
 
 
+class EmployeeSummaryModel(BaseModel):
+    uid: uuid.UUID
+    username: str
+    email: str
+
+
 class RoleUpdateSchema(BaseModel):
     role: RolesEnum
 
@@ -1,12 +1,19 @@
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from src.core.config import config_obj
+from src.db import fastpath
 from src.db.models import User
 from .schemas import RoleUpdateSchema
-from src.errors import EmployeeNotFound
+from src.errors import EmployeeNotFound, InsufficientPermission
+from src.auth.principals import principal_cache
+from src.tasks.services import TaskService
+
+task_service = TaskService()
 
 
 class EmployeeManagementService:
+    fast_path = config_obj.EMPLOYEE_LOOKUP_FAST_PATH
 
     # --------------------------------------------------
     # GET ALL EMPLOYEES
@@ -19,10 +26,14 @@ class EmployeeManagementService:
     # --------------------------------------------------
     # GET EMPLOYEE BY ID (Single source of truth)
     # --------------------------------------------------
-    async def get_employee_by_id(self, uid: str, session: AsyncSession):
-        statement = select(User).where(User.uid == uid)
-        result = await session.exec(statement)
-        employee = result.first()
+    async def get_employee_by_id(self, uid: str, session: AsyncSession, writable: bool = False):
+        """A read-only UserRecord on the fast path; writable=True for an ORM User to change."""
+        if self.fast_path and not writable:
+            employee = await fastpath.user_by_uid(session, uid)
+        else:
+            statement = select(User).where(User.uid == uid)
+            result = await session.exec(statement)
+            employee = result.first()
 
         if not employee:
             raise EmployeeNotFound("Employee not found")
@@ -38,21 +49,26 @@ class EmployeeManagementService:
         update_employee_role: RoleUpdateSchema,
         session: AsyncSession
     ):
-        employee = await self.get_employee_by_id(uid, session)
+        employee = await self.get_employee_by_id(uid, session, writable=True)
 
         update_data = update_employee_role.model_dump()
         employee.role = update_data["role"]
 
         await session.commit()
+        await principal_cache.invalidate(employee.uid)
         await session.refresh(employee)
         return employee
 
     # --------------------------------------------------
     # DELETE EMPLOYEE
     # --------------------------------------------------
-    async def delete_user(self, uid: str, session: AsyncSession):
-        employee = await self.get_employee_by_id(uid, session)
+    async def delete_user(self, uid: str, current_user: User, session: AsyncSession):
+        employee = await self.get_employee_by_id(uid, session, writable=True)
+        # Whoever deletes the account takes over the tasks it created
+        if employee.uid == current_user.uid:
+            raise InsufficientPermission()
 
-        await session.delete(employee)
-        await session.commit()
+        # Counters, delta sync and caches are kept in step with their tasks
+        await task_service.delete_user(employee, current_user, session)
+        await principal_cache.invalidate(employee.uid)
         return employee
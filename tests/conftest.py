@@ -0,0 +1,49 @@
+"""Shared fixtures: settings for importing src, and an in-memory Redis.
+
+Redis is fakeredis (Lua scripts need the lupa extra, see requirements-dev.txt),
+swapped in before src creates its client. Only test_query_plans.py needs
+Postgres, and skips when it cannot reach one.
+"""
+import os
+
+import fakeredis
+import pytest
+import redis.asyncio
+
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://postgres@localhost/taskcollab_test")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("MAIL_USERNAME", "test")
+os.environ.setdefault("MAIL_PASSWORD", "test")
+os.environ.setdefault("MAIL_FROM", "noreply@example.com")
+os.environ.setdefault("MAIL_PORT", "587")
+os.environ.setdefault("MAIL_SERVER", "localhost")
+os.environ.setdefault("MAIL_FROM_NAME", "Task Collaboration")
+os.environ.setdefault("DOMAIN", "localhost:8000")
+
+fake_redis_server = fakeredis.FakeServer()
+
+
+class FakeRedis(fakeredis.FakeAsyncRedis):
+    """Takes the connection arguments src passes to Redis and ignores them."""
+
+    def __init__(self, *args, host=None, port=None, **kwargs):
+        super().__init__(*args, server=fake_redis_server, **kwargs)
+
+
+redis.asyncio.Redis = FakeRedis
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def redis_client():
+    from src.db.redis import redis_client
+
+    await redis_client.flushall()
+    yield redis_client
+    # Each test runs in its own event loop; don't carry connections across
+    await redis_client.connection_pool.disconnect()
@@ -0,0 +1,40 @@
+"""Postgres for the tests that need one: TEST_DATABASE_URL, else DATABASE_URL.
+
+It must be migrated to head (`alembic upgrade head`). Tests skip when no such
+database is reachable, and leave no rows behind.
+"""
+import os
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", os.environ.get("DATABASE_URL"))
+
+
+@asynccontextmanager
+async def migrated_engine() -> AsyncEngine:
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    try:
+        try:
+            async with engine.connect() as connection:
+                migrated = await connection.scalar(text("SELECT to_regclass('task_tombstones') IS NOT NULL"))
+        except (OSError, exc.OperationalError, exc.InterfaceError) as e:
+            pytest.skip(f"no database at TEST_DATABASE_URL: {e}")
+        if not migrated:
+            pytest.skip("the database is not migrated")
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+@asynccontextmanager
+async def rolled_back_connection() -> AsyncConnection:
+    async with migrated_engine() as engine, engine.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            yield connection
+        finally:
+            await transaction.rollback()
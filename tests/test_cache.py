@@ -0,0 +1,50 @@
+import pytest
+
+from src.core import cache
+from src.core.cache import LRUCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_evicts_least_recently_used():
+    lru = LRUCache(maxsize=2, ttl=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1      # "b" is now the oldest
+
+    lru.set("c", 3)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+    assert lru.evictions == 1
+
+
+def test_entries_expire(clock):
+    lru = LRUCache(maxsize=10, ttl=5)
+    lru.set("a", 1)
+    lru.set("b", 2, ttl=30)
+
+    clock[0] += 6
+
+    assert lru.get("a") is None
+    assert lru.get("b") == 2
+    assert lru.expirations == 1
+    assert "a" not in lru.entries
+
+
+def test_set_replaces_and_delete_removes():
+    lru = LRUCache(maxsize=10, ttl=60)
+    lru.set("a", 1)
+    lru.set("a", 2)
+    assert lru.get("a") == 2
+
+    lru.delete("a")
+    lru.delete("missing")
+
+    assert lru.get("a") is None
@@ -0,0 +1,54 @@
+import pytest
+from sqlmodel import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.tasks.services import TaskService
+from .database import rolled_back_connection
+
+pytestmark = pytest.mark.anyio
+
+task_service = TaskService()
+
+
+@pytest.fixture
+async def fresh_feed():
+    """A session whose task_change_seq has never been drawn from.
+
+    The temporary sequence shadows the real one for this connection only, and
+    goes away with the rolled back transaction.
+    """
+    async with rolled_back_connection() as connection:
+        await connection.exec_driver_sql("CREATE TEMP SEQUENCE task_change_seq")
+        async with AsyncSession(bind=connection) as session:
+            yield session
+
+
+async def next_change_seq(session: AsyncSession) -> int:
+    return await session.scalar(text("SELECT nextval('task_change_seq')"))
+
+
+async def test_horizon_before_and_after_the_first_change(fresh_feed):
+    assert await task_service.change_horizon(fresh_feed) == 0
+
+    assert await next_change_seq(fresh_feed) == 1
+    assert await task_service.change_horizon(fresh_feed) == 1
+
+
+async def test_first_change_follows_an_empty_feed_cursor(fresh_feed):
+    tasks, deleted, cursor, has_more = await task_service.get_changes(fresh_feed, since=0)
+    assert (tasks, deleted, cursor, has_more) == ([], [], 0, False)
+
+    user_uid = await fresh_feed.scalar(text(
+        "INSERT INTO users (uid, username, email, password_hash, role, is_verified, created_at, updated_at) "
+        "VALUES (gen_random_uuid(), 'feed', 'feed@example.com', '', 'admin', true, now(), now()) RETURNING uid"
+    ))
+    task_uid = await fresh_feed.scalar(text(
+        "INSERT INTO tasks (uid, title, description, status, priority, created_at, updated_at, version, "
+        "change_seq, created_by) VALUES (gen_random_uuid(), 'First', '', 'pending', 'medium', now(), now(), 1, "
+        "nextval('task_change_seq'), :user_uid) RETURNING uid"
+    ), params={"user_uid": user_uid})
+
+    tasks, deleted, cursor, has_more = await task_service.get_changes(fresh_feed, since=cursor)
+
+    assert task_uid in [task.uid for task in tasks]
+    assert cursor == 1
@@ -0,0 +1,68 @@
+import pytest
+from sqlmodel import select, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import Task, User
+from src.tasks.services import TaskService
+from src.tasks.stats import TaskStatsService
+from .database import rolled_back_connection
+
+pytestmark = pytest.mark.anyio
+
+task_service = TaskService()
+stats_service = TaskStatsService()
+
+
+@pytest.fixture
+async def session(redis_client):
+    """Like the app's sessions, but its commits are savepoints in a transaction that is rolled back."""
+    async with rolled_back_connection() as connection:
+        async with AsyncSession(
+            bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False
+        ) as session:
+            yield session
+
+
+async def add_user(session: AsyncSession, name: str, role: str) -> User:
+    uid = await session.scalar(text(
+        "INSERT INTO users (uid, username, email, password_hash, role, is_verified, created_at, updated_at) "
+        "VALUES (gen_random_uuid(), :name, :email, '', :role, true, now(), now()) RETURNING uid"
+    ), params={"name": name, "email": f"{name}@example.com", "role": role})
+    return await session.get(User, uid)
+
+
+async def add_task(session: AsyncSession, title: str, created_by: User, assigned_to: User):
+    return await session.scalar(text(
+        "INSERT INTO tasks (uid, title, description, status, priority, created_at, updated_at, version, "
+        "change_seq, created_by, assigned_to) VALUES (gen_random_uuid(), :title, '', 'pending', 'medium', now(), "
+        "now(), 1, nextval('task_change_seq'), :created_by, :assigned_to) RETURNING uid"
+    ), params={"title": title, "created_by": created_by.uid, "assigned_to": assigned_to.uid})
+
+
+async def test_deleted_users_tasks_are_kept(session):
+    admin = await add_user(session, "deleting-admin", "admin")
+    leaving = await add_user(session, "leaving-manager", "manager")
+    colleague = await add_user(session, "staying-user", "user")
+    handed = await add_task(session, "Created by them", created_by=leaving, assigned_to=colleague)
+    kept = await add_task(session, "Assigned to them", created_by=colleague, assigned_to=leaving)
+    own = await add_task(session, "Their own", created_by=leaving, assigned_to=leaving)
+    await stats_service.reconcile(session)
+
+    await task_service.delete_user(leaving, admin, session)
+
+    stats = await stats_service.get_stats(session)
+    assert await stats_service.reconcile(session) == stats
+    assert str(leaving.uid) not in stats["by_assignee"]
+
+    tasks = {
+        task.uid: (task.created_by, task.assigned_to, task.version)
+        for task in (await session.scalars(
+            select(Task).where(Task.uid.in_([handed, kept, own])).execution_options(populate_existing=True)
+        )).all()
+    }
+    assert tasks == {
+        handed: (admin.uid, colleague.uid, 2),
+        kept: (colleague.uid, None, 2),
+        own: (admin.uid, None, 3),
+    }
+    assert await session.get(User, leaving.uid) is None
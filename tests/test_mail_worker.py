@@ -0,0 +1,175 @@
+import json
+import socket
+import time
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from src.mail import (
+    create_message, enqueue_messages, mail_config,
+    MAIL_QUEUE_KEY, MAIL_PROCESSING_KEY, MAIL_RETRY_KEY, MAIL_DEAD_LETTER_KEY
+)
+from src.mail_worker import MailWorker
+
+pytestmark = pytest.mark.anyio
+
+
+class Handler:
+    """Accepts every message, or answers DATA with `reply` when one is set."""
+
+    def __init__(self):
+        self.received = []
+        self.reply = None
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.reply:
+            return self.reply
+        self.received.append(envelope)
+        return "250 Message accepted for delivery"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    handler = Handler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    monkeypatch.setattr(mail_config, "MAIL_SERVER", controller.hostname)
+    monkeypatch.setattr(mail_config, "MAIL_PORT", controller.port)
+    monkeypatch.setattr(mail_config, "MAIL_SSL_TLS", False)
+    monkeypatch.setattr(mail_config, "MAIL_STARTTLS", False)
+    monkeypatch.setattr(mail_config, "USE_CREDENTIALS", False)
+    yield handler
+    controller.stop()
+
+
+@pytest.fixture
+async def worker(redis_client, smtp_server):
+    worker = MailWorker()
+    yield worker
+    await worker.disconnect()
+
+
+async def drain(worker: MailWorker) -> None:
+    for raw in await worker.next_batch():
+        await worker.process(raw)
+
+
+async def test_sends_queued_mail(redis_client, smtp_server, worker):
+    await enqueue_messages(
+        create_message(["alice@example.com"], "First", "<p>one</p>"),
+        create_message(["bob@example.com"], "Second", "<p>two</p>"),
+    )
+
+    await drain(worker)
+
+    assert [envelope.rcpt_tos for envelope in smtp_server.received] == [["alice@example.com"], ["bob@example.com"]]
+    assert worker.sent == 2
+    assert await redis_client.llen(MAIL_QUEUE_KEY) == 0
+    assert await redis_client.llen(MAIL_PROCESSING_KEY) == 0
+
+
+async def test_retries_temporary_failure(redis_client, smtp_server, worker):
+    smtp_server.reply = "451 Try again later"
+    message = create_message(["alice@example.com"], "Hello", "<p>hi</p>")
+    await enqueue_messages(message)
+
+    await drain(worker)
+
+    [(raw, due)] = await redis_client.zrange(MAIL_RETRY_KEY, 0, -1, withscores=True)
+    retried = json.loads(raw)
+    assert retried["id"] == message["id"]
+    assert retried["attempts"] == 1
+    assert due > time.time()
+    assert worker.retried == 1
+    assert await redis_client.llen(MAIL_PROCESSING_KEY) == 0
+
+
+async def test_retries_when_server_unreachable(redis_client, worker, monkeypatch):
+    monkeypatch.setattr(mail_config, "MAIL_PORT", free_port())    # nothing listens there
+    await enqueue_messages(create_message(["alice@example.com"], "Hello", "<p>hi</p>"))
+
+    await drain(worker)
+
+    assert await redis_client.zcard(MAIL_RETRY_KEY) == 1
+    assert worker.smtp is None
+    assert await redis_client.llen(MAIL_PROCESSING_KEY) == 0
+
+
+async def test_retry_is_sent_once_due(redis_client, smtp_server, worker):
+    message = create_message(["alice@example.com"], "Hello", "<p>hi</p>")
+    message["attempts"] = 1
+    await redis_client.zadd(MAIL_RETRY_KEY, {json.dumps(message): time.time() - 1})
+
+    await worker.promote_due_retries()
+    await drain(worker)
+
+    assert len(smtp_server.received) == 1
+    assert await redis_client.zcard(MAIL_RETRY_KEY) == 0
+
+
+async def test_dead_letters_permanent_failure(redis_client, smtp_server, worker):
+    smtp_server.reply = "550 No such user"
+    await enqueue_messages(create_message(["nobody@example.com"], "Hello", "<p>hi</p>"))
+
+    await drain(worker)
+
+    [raw] = await redis_client.lrange(MAIL_DEAD_LETTER_KEY, 0, -1)
+    assert "No such user" in json.loads(raw)["last_error"]
+    assert await redis_client.zcard(MAIL_RETRY_KEY) == 0
+    assert await redis_client.llen(MAIL_PROCESSING_KEY) == 0
+
+
+async def test_dead_letters_last_attempt(redis_client, smtp_server, worker):
+    smtp_server.reply = "451 Try again later"
+    message = create_message(["alice@example.com"], "Hello", "<p>hi</p>")
+    message["attempts"] = 5
+    await enqueue_messages(message)
+
+    await drain(worker)
+
+    assert json.loads(await redis_client.lindex(MAIL_DEAD_LETTER_KEY, 0))["attempts"] == 6
+    assert await redis_client.zcard(MAIL_RETRY_KEY) == 0
+
+
+@pytest.mark.parametrize("raw", [
+    "not json",
+    json.dumps(["a", "list"]),
+    json.dumps({"id": "no-recipients", "subject": "Hello", "body": "hi"}),
+    json.dumps(create_message(["alice@example.com"], "Bad\nheader", "hi")),
+], ids=["not-json", "not-an-object", "missing-field", "bad-header"])
+async def test_dead_letters_malformed_message(redis_client, smtp_server, worker, raw):
+    await redis_client.lpush(MAIL_QUEUE_KEY, raw)
+    await enqueue_messages(create_message(["alice@example.com"], "After", "<p>hi</p>"))
+
+    await drain(worker)
+
+    [dead] = await redis_client.lrange(MAIL_DEAD_LETTER_KEY, 0, -1)
+    assert json.loads(dead)["last_error"]
+    assert worker.dead_lettered == 1
+    assert len(smtp_server.received) == 1      # the next message still goes out
+    assert await redis_client.llen(MAIL_PROCESSING_KEY) == 0
+
+
+async def test_recover_queues_held_messages(redis_client, smtp_server, worker):
+    # Left behind by a worker that stopped mid-batch, oldest at the right
+    held = [json.dumps(create_message([f"user{i}@example.com"], "Hello", "<p>hi</p>")) for i in range(3)]
+    await redis_client.lpush(MAIL_PROCESSING_KEY, *held)
+    await redis_client.lpush(MAIL_QUEUE_KEY, json.dumps(create_message(["new@example.com"], "Hello", "<p>hi</p>")))
+
+    await worker.recover()
+
+    assert await redis_client.llen(MAIL_PROCESSING_KEY) == 0
+    queue = await redis_client.lrange(MAIL_QUEUE_KEY, 0, -1)
+    assert len(queue) == 4
+
+    await drain(worker)
+
+    assert [envelope.rcpt_tos[0] for envelope in smtp_server.received] == [
+        "user0@example.com", "user1@example.com", "user2@example.com", "new@example.com"
+    ]
@@ -0,0 +1,98 @@
+import json
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from src.mail import MAIL_QUEUE_KEY
+from src.tasks import notifications
+from src.tasks.notifications import AssignmentDigest, DIGEST_DUE_KEY
+
+pytestmark = pytest.mark.anyio
+
+ALICE = SimpleNamespace(uid=uuid.uuid4(), username="alice", email="alice@example.com")
+BOB = SimpleNamespace(uid=uuid.uuid4(), username="bob", email="bob@example.com")
+
+
+def task(title: str, uid=None) -> SimpleNamespace:
+    return SimpleNamespace(uid=uid or uuid.uuid4(), title=title, due_date=None, status="pending")
+
+
+class FakeSession:
+    """Answers the digest's one users query."""
+
+    def __init__(self, users):
+        self.users = users
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def exec(self, statement):
+        return SimpleNamespace(all=lambda: self.users)
+
+
+@pytest.fixture
+def users(monkeypatch):
+    monkeypatch.setattr(notifications, "async_session_maker", lambda: FakeSession([ALICE, BOB]))
+
+
+async def close_windows(redis_client):
+    due = await redis_client.zrange(DIGEST_DUE_KEY, 0, -1)
+    await redis_client.zadd(DIGEST_DUE_KEY, {user_uid: 0 for user_uid in due})
+
+
+async def queued_messages(redis_client) -> dict:
+    messages = [json.loads(raw) for raw in await redis_client.lrange(MAIL_QUEUE_KEY, 0, -1)]
+    return {message["recipients"][0]: message for message in messages}
+
+
+async def test_one_digest_per_recipient(redis_client, users):
+    digest = AssignmentDigest(window_seconds=60)
+    reassigned = task("reassigned")
+    await digest.add((task("first"), ALICE.uid), (task("second"), ALICE.uid), (reassigned, ALICE.uid))
+    await digest.add((reassigned, ALICE.uid), (task("<script>"), BOB.uid))
+
+    assert await digest.run_once() == 0     # windows still open
+
+    await close_windows(redis_client)
+    assert await digest.run_once() == 2
+
+    messages = await queued_messages(redis_client)
+    assert messages["alice@example.com"]["subject"] == "You have been assigned tasks"
+    assert messages["alice@example.com"]["body"].count("<li>") == 3   # "reassigned" listed once
+    assert messages["bob@example.com"]["subject"] == "You have been assigned a task"
+    assert "&lt;script&gt;" in messages["bob@example.com"]["body"]
+    assert await redis_client.zcard(DIGEST_DUE_KEY) == 0
+    assert await redis_client.exists(digest.events_key(ALICE.uid)) == 0
+
+
+async def test_window_opens_on_first_assignment(redis_client):
+    digest = AssignmentDigest(window_seconds=60)
+    await digest.add((task("first"), ALICE.uid))
+    opened = await redis_client.zscore(DIGEST_DUE_KEY, str(ALICE.uid))
+
+    await digest.add((task("second"), ALICE.uid))
+
+    assert await redis_client.zscore(DIGEST_DUE_KEY, str(ALICE.uid)) == opened
+    assert opened == pytest.approx(time.time() + 60, abs=5)
+
+
+async def test_failed_pass_keeps_events(redis_client, monkeypatch):
+    def unavailable():
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(notifications, "async_session_maker", unavailable)
+    digest = AssignmentDigest(window_seconds=60)
+    await digest.add((task("first"), ALICE.uid))
+    await close_windows(redis_client)
+
+    with pytest.raises(ConnectionError):
+        await digest.run_once()
+
+    assert await redis_client.llen(digest.events_key(ALICE.uid)) == 1
+    assert await redis_client.zscore(DIGEST_DUE_KEY, str(ALICE.uid)) > time.time()
+    assert await redis_client.llen(MAIL_QUEUE_KEY) == 0
@@ -0,0 +1,218 @@
+"""The hot queries use their indexes on a table shaped like production.
+
+Needs Postgres (see tests/database.py). Rows are seeded and analyzed in a
+transaction that is rolled back, and the planner runs with its default
+settings, so each plan is the one it would pick for a table of this size.
+ANALYZE leaves the tables' row estimates in pg_class behind until autovacuum
+updates them.
+"""
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlmodel import select
+
+from src.db import fastpath
+from src.db.models import Task, TaskTombstone, User
+from src.tasks.reminders import DueDateReminderScheduler
+from src.tasks.services import TaskService
+from src.users.services import EmployeeManagementService
+from .database import rolled_back_connection
+
+SEED_USERS = 50000
+SEED_TASKS = 100000
+SEED_SEQ = 10 ** 12      # above any real change_seq; the sequence itself is not touched
+# Tasks take the even change_seq values, their tombstones the odd ones after them
+
+SEED_SQL = [
+    f"""
+    INSERT INTO users (uid, username, email, password_hash, role, is_verified, created_at, updated_at)
+    SELECT gen_random_uuid(), 'plan-user-' || i, 'plan-user-' || i || '@example.com', '',
+           CASE WHEN i % 20 = 0 THEN 'manager' ELSE 'user' END, true,
+           now() - ({SEED_USERS} - i) * interval '1 minute', now() - ({SEED_USERS} - i) * interval '1 minute'
+    FROM generate_series(1, {SEED_USERS}) AS i
+    """,
+    f"""
+    WITH seeded AS (
+        SELECT array_agg(uid ORDER BY email) AS uids FROM users WHERE starts_with(email, 'plan-user-')
+    )
+    INSERT INTO tasks (uid, title, description, status, priority, due_date, reminder_sent_at,
+                       created_at, updated_at, version, change_seq, created_by, assigned_to)
+    SELECT gen_random_uuid(), 'Task ' || i, '',
+           (ARRAY['pending', 'in_progress', 'completed'])[1 + i % 3],
+           (ARRAY['low', 'medium', 'high'])[1 + (i / 3) % 3],
+           now() + (i % 400 - 200) * interval '1 day',
+           -- overdue tasks were reminded, except those that fell due in the last day
+           CASE WHEN i % 400 < 199 THEN now() END,
+           now() - ({SEED_TASKS} - i) * interval '10 seconds', now() - ({SEED_TASKS} - i) * interval '10 seconds',
+           1, {SEED_SEQ} + 2 * i,
+           uids[1 + (i * 7919) % {SEED_USERS}],
+           CASE WHEN i % 10 = 0 THEN NULL ELSE uids[1 + (i * 104729) % {SEED_USERS}] END
+    FROM seeded, generate_series(1::bigint, {SEED_TASKS}) AS i
+    """,
+    f"""
+    INSERT INTO task_tombstones (change_seq, uid, created_by, assigned_to, revoked)
+    SELECT change_seq + 1, uid, created_by, assigned_to, change_seq % 4 = 0
+    FROM tasks WHERE change_seq > {SEED_SEQ} AND change_seq % 10 = 0
+    """,
+    f"""
+    INSERT INTO tasks_archive ({", ".join(fastpath.TaskRecord.__slots__)})
+    SELECT {", ".join(fastpath.TaskRecord.__slots__)} FROM tasks
+    WHERE change_seq > {SEED_SEQ} AND change_seq % 10 = 2
+    """,
+    "ANALYZE users, tasks, task_tombstones, tasks_archive",
+]
+
+pytestmark = pytest.mark.anyio
+
+task_service = TaskService()
+
+
+@pytest.fixture(scope="module")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="module")
+async def seeded():
+    """A connection that sees the seeded rows, plus a user and a task from them."""
+    async with rolled_back_connection() as connection:
+        for sql in SEED_SQL:
+            await connection.exec_driver_sql(sql)
+        user = (await connection.execute(
+            select(User.uid, User.email, User.role).where(User.email == "plan-user-1@example.com")
+        )).one()
+        task_uid = await connection.scalar(select(Task.uid).where(Task.change_seq == SEED_SEQ + 2))
+        yield SimpleNamespace(connection=connection, user=user, task_uid=task_uid)
+
+
+async def explain(connection, sql: str, *args) -> list[dict]:
+    """Every node of the plan, depth first."""
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}", args)
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    nodes, pending = [], [plan[0]["Plan"]]
+    while pending:
+        node = pending.pop()
+        nodes.append(node)
+        pending.extend(node.get("Plans", ()))
+    return nodes
+
+
+async def explain_statement(connection, statement) -> list[dict]:
+    compiled = statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    return await explain(connection, str(compiled))
+
+
+def assert_uses(nodes: list[dict], *indexes: str, ordered: bool = False) -> None:
+    """The plan reads through one of `indexes`; `ordered`: in the order the query asks for."""
+    seq_scans = [node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"]
+    used = {node["Index Name"] for node in nodes if "Index Name" in node}
+    assert not seq_scans, f"sequential scan of {seq_scans}"
+    assert used & set(indexes), f"expected one of {indexes}, plan used {used or 'no index'}"
+    if ordered:
+        assert not [node for node in nodes if node["Node Type"] == "Sort"], "rows are sorted after the scan"
+
+
+def task_page(**filters):
+    return task_service.visible_tasks_statement(select(Task), **filters).order_by(
+        Task.created_at.desc(), Task.uid.desc()
+    ).limit(20)
+
+
+async def test_own_task_page(seeded):
+    nodes = await explain_statement(seeded.connection, task_page(current_user=seeded.user))
+    assert_uses(nodes, "ix_tasks_assigned_to_created_at_uid")
+    assert_uses(nodes, "ix_tasks_created_by_created_at_uid")
+
+
+# A filter matching a third of the rows may also be served by walking
+# ix_tasks_created_at_uid until the page is full; either way nothing is sorted
+@pytest.mark.parametrize("filters, index", [
+    ({}, "ix_tasks_created_at_uid"),
+    ({"status": "pending"}, "ix_tasks_status_created_at_uid"),
+    ({"priority": "high"}, "ix_tasks_priority_created_at_uid"),
+], ids=["all", "status", "priority"])
+async def test_filtered_task_page(seeded, filters, index):
+    nodes = await explain_statement(seeded.connection, task_page(**filters))
+    assert_uses(nodes, index, "ix_tasks_created_at_uid", ordered=True)
+
+
+async def test_assignee_task_page(seeded):
+    statement = task_page(assignee=str(seeded.user.uid))
+    assert_uses(await explain_statement(seeded.connection, statement), "ix_tasks_assigned_to_created_at_uid")
+
+
+async def test_all_employees(seeded):
+    statements = []
+
+    class Session:
+        async def exec(self, statement):
+            statements.append(statement)
+            return SimpleNamespace(all=list)
+
+    await EmployeeManagementService().get_all_employees(Session())
+
+    assert_uses(await explain_statement(seeded.connection, statements[0]), "ix_users_created_at")
+
+
+async def test_user_lookups(seeded):
+    assert_uses(
+        await explain_statement(seeded.connection, select(User).where(User.email == seeded.user.email)),
+        "ix_users_email"
+    )
+    assert_uses(await explain(seeded.connection, fastpath.USER_BY_EMAIL_SQL, seeded.user.email), "ix_users_email")
+    assert_uses(await explain(seeded.connection, fastpath.USER_BY_UID_SQL, seeded.user.uid), "users_pkey")
+
+
+async def test_task_lookups(seeded):
+    assert_uses(await explain(seeded.connection, fastpath.TASK_BY_UID_SQL, seeded.task_uid), "tasks_pkey")
+    assert_uses(
+        await explain(seeded.connection, fastpath.ARCHIVED_TASK_BY_UID_SQL, seeded.task_uid), "tasks_archive_pkey"
+    )
+
+
+@pytest.mark.parametrize("as_user", [False, True], ids=["everyone", "user"])
+async def test_change_feed(seeded, as_user):
+    # The last thousand changes
+    horizon = SEED_SEQ + 2 * SEED_TASKS + 1
+    since = horizon - 1000
+    current_user = seeded.user if as_user else None
+    tasks = task_service.visible_tasks_statement(
+        select(Task).where(Task.change_seq > since, Task.change_seq <= horizon), current_user=current_user
+    ).order_by(Task.change_seq).limit(501)
+    tombstones = task_service.visible_tombstones_statement(
+        select(TaskTombstone).where(TaskTombstone.change_seq > since, TaskTombstone.change_seq <= horizon),
+        current_user=current_user
+    ).order_by(TaskTombstone.change_seq).limit(501)
+
+    # A user's own few tasks may be cheaper to find through the visibility indexes
+    task_indexes = ["ix_tasks_change_seq"]
+    if as_user:
+        task_indexes += ["ix_tasks_assigned_to_created_at_uid", "ix_tasks_created_by_created_at_uid"]
+    assert_uses(await explain_statement(seeded.connection, tasks), *task_indexes, ordered=not as_user)
+    assert_uses(await explain_statement(seeded.connection, tombstones), "task_tombstones_pkey", ordered=True)
+
+
+async def test_reminder_batch(seeded):
+    statements = []
+
+    class Session:
+        async def exec(self, statement):
+            statements.append(statement)
+            return SimpleNamespace(all=list)
+
+    now = datetime.now(timezone.utc)
+    await DueDateReminderScheduler().next_batch(Session(), now, None)
+    await DueDateReminderScheduler().next_batch(Session(), now, (now - timedelta(days=5), uuid.uuid4()))
+
+    # Either partial index bounds the scan to open tasks already due; which
+    # one is cheaper depends on how many of those were reminded before
+    for statement in statements:
+        nodes = await explain_statement(seeded.connection, statement)
+        assert_uses(nodes, "ix_tasks_reminder_due_date_uid", "ix_tasks_open_due_date")
@@ -0,0 +1,92 @@
+import asyncio
+import uuid
+
+import pytest
+
+from src.db import redis as blocklist
+from src.db.redis import BLOCKLIST_PREFIX, RevokedTokens
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def revoked(redis_client, monkeypatch):
+    tokens = RevokedTokens()
+    # add_jti_to_blocklist records in the module's instance
+    monkeypatch.setattr(blocklist, "revoked_tokens", tokens)
+    yield tokens
+    if tokens.listener is not None:
+        tokens.listener.cancel()
+        await asyncio.gather(tokens.listener, return_exceptions=True)
+
+
+async def wait_until(condition, timeout: float = 2.0) -> None:
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def test_checks_redis_until_synced(redis_client, revoked):
+    await redis_client.set(BLOCKLIST_PREFIX + "old", "", ex=60)
+
+    assert await revoked.contains("old")
+    assert not await revoked.contains("fresh")
+    assert revoked.redis_checks == 2
+
+
+async def test_syncs_existing_and_published_revocations(redis_client, revoked):
+    await redis_client.set(BLOCKLIST_PREFIX + "old", "", ex=60)
+    revoked.start()
+    await wait_until(lambda: revoked.synced)
+
+    # Published by another worker: only the subscription can tell this one
+    await redis_client.publish(blocklist.BLOCKLIST_CHANNEL, "elsewhere")
+    await wait_until(lambda: "elsewhere" in revoked.revoked)
+    await blocklist.add_jti_to_blocklist("here")
+
+    assert await revoked.contains("old")
+    assert await revoked.contains("elsewhere")
+    assert await revoked.contains("here")
+    assert not await revoked.contains("fresh")
+    assert revoked.redis_checks == 0
+    assert await redis_client.exists(BLOCKLIST_PREFIX + "here")
+
+
+async def test_revocations_from_before_the_prefix(redis_client, revoked):
+    legacy = str(uuid.uuid4())
+    await redis_client.set(legacy, "", ex=60)
+    await redis_client.set("task:" + legacy, "{}", ex=60)      # not a revocation
+
+    assert await revoked.contains(legacy)
+
+    revoked.start()
+    await wait_until(lambda: revoked.synced)
+
+    assert await revoked.contains(legacy)
+    assert not await revoked.contains("task:" + legacy)
+    assert 0 < await redis_client.ttl(BLOCKLIST_PREFIX + legacy) <= 60
+    assert not await redis_client.exists(BLOCKLIST_PREFIX + "task:" + legacy)
+
+
+async def test_expired_entries_are_dropped(revoked, monkeypatch):
+    revoked.synced = True
+    revoked.listener = asyncio.get_running_loop().create_future()    # no subscription in this test
+    revoked.add("short", ttl=-1)
+    revoked.add("long", ttl=60)
+
+    assert not await revoked.contains("short")
+    assert "short" not in revoked.revoked
+    assert await revoked.contains("long")
+
+
+def test_prunes_expired_entries_as_it_grows(monkeypatch):
+    monkeypatch.setattr(blocklist, "BLOCKLIST_PRUNE_SIZE", 4)
+    revoked = RevokedTokens()
+    for jti in "abcd":
+        revoked.add(jti, ttl=-1)
+
+    revoked.add("live", ttl=60)
+
+    assert set(revoked.revoked) == {"live"}
+    assert revoked.prune_at == 4
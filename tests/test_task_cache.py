@@ -0,0 +1,86 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from src.tasks import cache
+from src.tasks.cache import TaskCache
+
+pytestmark = pytest.mark.anyio
+
+TASK_UID = uuid.uuid4()
+
+
+class UnavailableRedis:
+    """Every command and script fails as it would with Redis down."""
+
+    def register_script(self, script):
+        return self.fail
+
+    async def fail(self, *args, **kwargs):
+        raise ConnectionError("Redis is unavailable")
+
+    def __getattr__(self, name):
+        return self.fail
+
+
+def task(version: int) -> SimpleNamespace:
+    return SimpleNamespace(uid=TASK_UID, version=version)
+
+
+@pytest.fixture
+async def task_cache(redis_client):
+    return TaskCache()
+
+
+@pytest.fixture
+def unavailable(monkeypatch):
+    monkeypatch.setattr(cache, "redis_client", UnavailableRedis())
+    return TaskCache()
+
+
+async def test_fill_then_hit(task_cache):
+    assert await task_cache.get(TASK_UID) is None
+
+    await task_cache.set(TASK_UID, 1, '"1"', "{}")
+
+    assert await task_cache.get(TASK_UID) == ('"1"', "{}")
+    task_cache.local.delete(task_cache.key(TASK_UID))
+    assert await task_cache.get(TASK_UID) == ('"1"', "{}")
+    assert (task_cache.misses, task_cache.local_hits, task_cache.redis_hits) == (1, 1, 1)
+
+
+async def test_refuses_fill_older_than_invalidation(task_cache):
+    await task_cache.set(TASK_UID, 1, '"1"', "{}")
+    await task_cache.invalidate(task(2))
+
+    # Loaded before the write committed, filled after its invalidation
+    await task_cache.set(TASK_UID, 1, '"1"', "{}")
+
+    assert await task_cache.get(TASK_UID) is None
+    assert task_cache.stale_fills == 1
+
+    await task_cache.set(TASK_UID, 2, '"2"', '{"version": 2}')
+    assert await task_cache.get(TASK_UID) == ('"2"', '{"version": 2}')
+
+
+async def test_refuses_fill_of_deleted_task(task_cache):
+    await task_cache.invalidate(task(5), deleted=True)
+
+    await task_cache.set(TASK_UID, 5, '"5"', "{}")
+
+    assert await task_cache.get(TASK_UID) is None
+    assert task_cache.stale_fills == 1
+
+
+async def test_unavailable_redis_is_a_miss(unavailable):
+    assert await unavailable.get(TASK_UID) is None
+    assert unavailable.misses == 1
+
+    # Filled locally only, and invalidation still clears that
+    await unavailable.set(TASK_UID, 1, '"1"', "{}")
+    assert await unavailable.get(TASK_UID) == ('"1"', "{}")
+    await unavailable.invalidate(task(2))
+    assert await unavailable.get(TASK_UID) is None
+    assert unavailable.redis_errors == 4
@@ -0,0 +1,43 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from src import app
+from src.tasks import routes
+from src.tasks.events import task_event_broker
+
+STREAM_URL = "/api/v1/tasks/stream"
+
+
+@pytest.fixture
+def client():
+    # Without the lifespan: no background jobs, nothing touches Postgres
+    return TestClient(app)
+
+
+def test_stream_rejects_invalid_token(client):
+    with pytest.raises(WebSocketDisconnect) as disconnect:
+        with client.websocket_connect(f"{STREAM_URL}?token=not-a-jwt") as websocket:
+            websocket.receive_text()
+
+    assert disconnect.value.code == 1008
+
+
+def test_stream_accepts_authenticated_user(client, monkeypatch):
+    user = SimpleNamespace(uid=uuid.uuid4(), role="user")
+    sessions = []
+
+    async def get_user_from_token(token, session):
+        sessions.append(session)
+        return user if token == "valid" else None
+
+    monkeypatch.setattr(routes, "get_user_from_token", get_user_from_token)
+
+    with client.websocket_connect(f"{STREAM_URL}?token=valid"):
+        assert str(user.uid) in task_event_broker.by_user
+
+    assert len(sessions) == 1
+    assert str(user.uid) not in task_event_broker.by_user
@@ -0,0 +1,82 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlmodel import text, update
+
+from src.db.models import Task
+from src.tasks.services import TaskService
+from .database import migrated_engine
+
+pytestmark = pytest.mark.anyio
+
+task_service = TaskService()
+
+
+@pytest.fixture
+async def engine():
+    async with migrated_engine() as engine:
+        yield engine
+
+
+@pytest.fixture
+async def seeded(engine):
+    """A committed user and a pending, unassigned task of theirs; deleted afterwards."""
+    async with engine.begin() as connection:
+        user_uid = await connection.scalar(text(
+            "INSERT INTO users (uid, username, email, password_hash, role, is_verified, created_at, updated_at) "
+            "VALUES (gen_random_uuid(), 'updates', :email, '', 'user', true, now(), now()) RETURNING uid"
+        ), {"email": f"updates-{uuid.uuid4()}@example.com"})
+        # change_seq 0 keeps it out of every change feed
+        task_uid = await connection.scalar(text(
+            "INSERT INTO tasks (uid, title, description, status, priority, created_at, updated_at, version, "
+            "change_seq, created_by) VALUES (gen_random_uuid(), 'Race', '', 'pending', 'medium', now(), now(), 1, "
+            "0, :user_uid) RETURNING uid"
+        ), {"user_uid": user_uid})
+    yield user_uid, task_uid
+    async with engine.begin() as connection:
+        await connection.execute(text("DELETE FROM tasks WHERE uid = :uid"), {"uid": task_uid})
+        await connection.execute(text("DELETE FROM users WHERE uid = :uid"), {"uid": user_uid})
+
+
+async def run_behind_writer(engine, user_uid, task_uid, statement):
+    """Runs `statement` while another transaction's update of the task is in flight.
+
+    The other transaction completes the task and assigns it; the statement
+    waits for its row lock and runs once that commits. Returns its rows.
+    """
+    async with engine.connect() as writer, engine.connect() as updater:
+        await writer.execute(
+            update(Task).where(Task.uid == task_uid).values(status="completed", assigned_to=user_uid)
+        )
+        updater_pid = await updater.scalar(text("SELECT pg_backend_pid()"))
+        pending = asyncio.create_task(updater.execute(statement))
+        while not await writer.scalar(text(
+            "SELECT wait_event_type = 'Lock' FROM pg_stat_activity WHERE pid = :pid"
+        ), {"pid": updater_pid}):
+            await asyncio.sleep(0.01)
+
+        await writer.commit()
+        rows = (await pending).all()
+        await updater.rollback()
+    return rows
+
+
+async def test_update_returns_what_a_concurrent_write_committed(engine, seeded):
+    user_uid, task_uid = seeded
+    statement = task_service.update_task_statement(task_uid, {"priority": "high"})
+
+    [row] = await run_behind_writer(engine, user_uid, task_uid, statement)
+
+    *_, old_status, old_priority, old_assignee = row
+    assert (old_status, old_priority, old_assignee) == ("completed", "medium", user_uid)
+
+
+async def test_bulk_update_returns_what_a_concurrent_write_committed(engine, seeded):
+    user_uid, task_uid = seeded
+    statement = task_service.bulk_update_statement({task_uid: {"priority": "high"}}, ["priority"])
+
+    [row] = await run_behind_writer(engine, user_uid, task_uid, statement)
+
+    *_, old_status, old_priority, old_assignee = row
+    assert (old_status, old_priority, old_assignee) == ("completed", "medium", user_uid)
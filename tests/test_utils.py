@@ -0,0 +1,53 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from src.errors import InvalidCursor, InvalidIfMatch
+from src.tasks.utils import decode_cursor, encode_cursor, etag_matches, parse_task_etag, task_etag
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 18, 9, 30, 15, 123456)
+    uid = uuid.uuid4()
+
+    cursor = encode_cursor(created_at, uid)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, uid)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(datetime.now(), uuid.uuid4())[:-4]])
+def test_malformed_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("if_none_match, matches", [
+    (None, False),
+    ("", False),
+    ("*", True),
+    ('"3"', True),
+    ('W/"3"', True),
+    ('"2", "3"', True),
+    ('"2", W/"4"', False),
+])
+def test_etag_matches(if_none_match, matches):
+    assert etag_matches(if_none_match, task_etag(3)) is matches
+
+
+@pytest.mark.parametrize("if_match, version", [
+    ("*", None),
+    (' * ', None),
+    ('"7"', 7),
+    ('W/"7"', 7),
+    ("7", 7),
+])
+def test_parse_task_etag(if_match, version):
+    assert parse_task_etag(if_match) == version
+
+
+@pytest.mark.parametrize("if_match", ['"abc"', '"1", "2"', ""])
+def test_parse_task_etag_malformed(if_match):
+    with pytest.raises(InvalidIfMatch):
+        parse_task_etag(if_match)